@@ -1,62 +1,193 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, Dict, Any
-from app.data import get_all_problems, filter_problems, get_problem_by_id
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
+from app.config import settings
+from app.services.problem_catalog import CursorError, get_problem_catalog, query_digest
+from app.services.solved_service import get_solved_service
+from app.utils.http_cache import cached_endpoint_response, response_cache_key
+from app.utils.tag_query import TagQueryError, parse_tag_query
 
 router = APIRouter(prefix="/problems", tags=["problems"])
 
+# Upper bound on ids per bulk lookup
+MAX_BATCH_IDS = 500
+
+
+class ProblemBatchRequest(BaseModel):
+    ids: List[str] = Field(..., max_length=MAX_BATCH_IDS)
+
 
 @router.get("")
 async def get_problems(
+    request: Request,
+    ids: Optional[str] = Query(None, max_length=5000, description="Comma-separated problem ids, e.g. 1900A,1900B"),
     tags: Optional[str] = Query(None, description="Comma-separated list of tags"),
+    tag_query: Optional[str] = Query(
+        None,
+        max_length=500,
+        description='Boolean tag expression, e.g. "dp AND (graphs OR trees) AND NOT implementation"'
+    ),
     min_rating: Optional[int] = Query(None, ge=800, le=3500, description="Minimum problem rating"),
     max_rating: Optional[int] = Query(None, ge=800, le=3500, description="Maximum problem rating"),
-    search: Optional[str] = Query(None, description="Search by problem name"),
-    sort_by: Optional[str] = Query("rating", description="Sort by: rating, solved_count"),
+    min_solved: Optional[int] = Query(None, ge=0, description="Minimum number of solves"),
+    search: Optional[str] = Query(None, max_length=100, description="Search by problem id, name or contest name"),
+    handle: Optional[str] = Query(None, max_length=64, description="Codeforces handle for exclude_solved and only_attempted"),
+    exclude_solved: bool = Query(False, description="Hide problems the handle has solved"),
+    only_attempted: bool = Query(False, description="Only problems the handle tried without solving"),
+    facets: bool = Query(False, description="Also return tag and rating facet counts under the filter"),
+    sort_by: Optional[str] = Query("rating", description="Sort by: rating, solved_count, contest_id, relevance"),
     limit: int = Query(100, ge=1, le=500, description="Maximum number of problems to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination")
-) -> Dict[str, Any]:
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, max_length=200, description="next_cursor of the previous page (overrides offset)")
+) -> Response:
     """
     Get problemset problems with filtering and sorting.
 
     Args:
+        ids: Only these problems (comma-separated ids, any casing)
         tags: Filter by tags (comma-separated)
+        tag_query: Filter by a boolean tag expression (AND, OR, NOT, parentheses)
         min_rating: Minimum problem rating
         max_rating: Maximum problem rating
-        search: Search query for problem name
-        sort_by: Sort field (rating or solved_count)
+        min_solved: Minimum number of solves
+        search: Search query (substring of id, name or contest name; typo
+            tolerant when nothing matches exactly)
+        handle: Codeforces handle the solved filters refer to
+        exclude_solved: Drop problems the handle has an accepted submission for
+        only_attempted: Keep only problems the handle submitted but never solved
+        facets: Include per-tag and per-rating-bucket counts of all matches
+        sort_by: Sort field (rating ascending, solved_count or contest_id
+            descending, relevance to the search)
         limit: Maximum number of results
         offset: Pagination offset
+        cursor: Opaque keyset cursor from a previous page; deep pages cost
+            the same as the first one
+
+    Returns:
+        Dictionary with problems, statistics and next_cursor (None after the
+        last page), plus the ids that matched nothing when ids is given and
+        facet counts when facets is set; 304 when If-None-Match matches
+    """
+    index = await get_problem_catalog().get_index()
+    if tag_query:
+        try:
+            parse_tag_query(tag_query)
+        except TagQueryError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid tag_query: {e}")
+    # Cursors only resume the query they were issued for
+    query = query_digest(
+        ids=ids, tags=tags, tag_query=tag_query, min_rating=min_rating, max_rating=max_rating,
+        min_solved=min_solved, search=search, handle=handle, exclude_solved=exclude_solved,
+        only_attempted=only_attempted
+    )
+    start = None
+    if cursor:
+        try:
+            start = index.decode_cursor(cursor, sort_by, query)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    solved_sets = None
+    max_age = settings.problemset_cache_ttl_seconds
+    key = f"{response_cache_key(request)}|v{index.version}"
+    if exclude_solved or only_attempted:
+        if not handle:
+            raise HTTPException(status_code=400, detail="handle is required with exclude_solved or only_attempted")
+        solved_sets = await get_solved_service().get(handle, index)
+        if solved_sets is None:
+            raise HTTPException(status_code=404, detail=f"User '{handle}' not found on Codeforces")
+        max_age = min(max_age, settings.user_status_cache_ttl_seconds)
+        key = f"{key}|s{solved_sets.generation}"
+
+    async def build() -> Dict[str, Any]:
+        # Parse tags
+        tag_list = [t.strip() for t in tags.split(",")] if tags else None
+
+        # Filter and sort on the columnar index
+        mask = index.mask(
+            min_rating=min_rating,
+            max_rating=max_rating,
+            tags=tag_list,
+            tag_query=tag_query,
+            min_solved=min_solved,
+            search=search
+        )
+        missing = None
+        if ids:
+            id_rows, missing = index.lookup([i for i in ids.split(",") if i.strip()])
+            selected = np.zeros(len(index), dtype=bool)
+            selected[id_rows] = True
+            mask &= selected
+        if exclude_solved:
+            mask &= ~index.unpack(solved_sets.solved)
+        if only_attempted:
+            mask &= index.unpack(solved_sets.attempted)
+        total = int(np.count_nonzero(mask))
+
+        # Paginate by walking the precomputed ordering
+        position = start if start is not None else index.position_of(sort_by, offset, mask, search)
+        rows, next_position = index.page(mask, sort_by, position, limit, search)
+
+        result = {
+            "problems": index.rows(rows),
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": index.encode_cursor(sort_by, next_position, query) if next_position >= 0 else None
+        }
+        if missing is not None:
+            result["missing"] = missing
+        if facets:
+            # From the same mask as the page, not a second filter pass
+            result["facets"] = index.facets(mask)
+        return result
+
+    return await cached_endpoint_response(request, build, max_age=max_age, key=key)
+
+
+@router.get("/autocomplete")
+async def autocomplete_problems(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="Partially typed search"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions")
+) -> Response:
+    """
+    Suggest problems for a search box as the user types.
+
+    Args:
+        q: Query typed so far
+        limit: Maximum number of suggestions
 
     Returns:
-        Dictionary with problems and statistics
+        Dictionary with the query and suggestions (id, name, rating), best first
     """
-    # Parse tags
-    tag_list = [t.strip() for t in tags.split(",")] if tags else None
-
-    # Filter problems
-    problems = filter_problems(
-        min_rating=min_rating,
-        max_rating=max_rating,
-        tags=tag_list,
-        search=search
+    index = await get_problem_catalog().get_index()
+
+    async def build() -> Dict[str, Any]:
+        return {"query": q, "suggestions": index.autocomplete(q, limit)}
+
+    return await cached_endpoint_response(
+        request,
+        build,
+        max_age=settings.problemset_cache_ttl_seconds,
+        key=f"{response_cache_key(request)}|v{index.version}"
     )
 
-    # Sort
-    if sort_by == "solved_count":
-        problems.sort(key=lambda x: x["solved_count"], reverse=True)
-    elif sort_by == "rating":
-        problems.sort(key=lambda x: x["rating"], reverse=False)
 
-    # Paginate
-    total = len(problems)
-    problems = problems[offset:offset + limit]
+@router.post("/batch")
+async def get_problems_batch(batch: ProblemBatchRequest) -> Dict[str, Any]:
+    """
+    Get many problems by ID in one round trip.
+
+    Args:
+        batch: Problem ids (any casing or separator, e.g. "1900b" or "1900-B")
 
-    return {
-        "problems": problems,
-        "total": total,
-        "limit": limit,
-        "offset": offset
-    }
+    Returns:
+        Dictionary with the problems in request order and the ids that matched nothing
+    """
+    index = await get_problem_catalog().get_index()
+    rows, missing = index.lookup(batch.ids)
+    return {"problems": index.rows(rows), "missing": missing}
 
 
 @router.get("/{problem_id}")
@@ -65,12 +196,12 @@ async def get_problem(problem_id: str):
     Get a specific problem by ID.
 
     Args:
-        problem_id: Problem ID
+        problem_id: Problem ID (contest id and index, e.g. 1900B; case-insensitive)
 
     Returns:
         Problem object
     """
-    problem = get_problem_by_id(problem_id)
+    problem = (await get_problem_catalog().get_index()).get(problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail=f"Problem '{problem_id}' not found")
     return problem
@@ -1,17 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import Dict, Any, List
+from app.config import settings
 from app.services.codeforces_client import get_cf_client
+from app.services.leaderboard_service import get_leaderboard_service
+from app.services.problem_catalog import get_problem_catalog
+from app.services.recommendation_service import get_recommendation_service
+from app.services.solved_service import get_solved_service
+from app.utils.http_cache import cached_endpoint_response, response_cache_key
 from collections import defaultdict
 from datetime import datetime
 
 router = APIRouter(prefix="/users", tags=["users"])
 
-# Known top Codeforces users for leaderboard
-TOP_USERS = [
-    "tourist", "Benq", "jiangly", "ecnerwala", "Um_nik",
-    "Petr", "maroonrk", "ksun48", "Radewoosh", "mnbvmar"
-]
-
 
 def calculate_monthly_growth(rating_history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Calculate monthly rating growth from rating history"""
@@ -77,46 +78,86 @@ async def search_users_endpoint(q: str = Query(..., min_length=1)):
 
 
 @router.get("/leaderboard")
-async def get_leaderboard_endpoint():
-    """Get leaderboard with top Codeforces users"""
-    cf_client = get_cf_client()
-
-    users_list = []
-    for handle in TOP_USERS:
-        user = await cf_client.get_user_info(handle)
-        if user:
-            users_list.append(user)
+async def get_leaderboard_endpoint(request: Request) -> Response:
+    """Get leaderboard with top Codeforces users (served from a background-refreshed snapshot)"""
+    snapshot = await get_leaderboard_service().get_leaderboard()
 
-    # Sort by rating
-    users_list.sort(key=lambda x: x.get("rating", 0), reverse=True)
+    async def build() -> Dict[str, Any]:
+        return snapshot
 
-    return {"users": users_list, "count": len(users_list)}
+    # Keyed by snapshot, so each refresh is encoded once and never served stale
+    return await cached_endpoint_response(
+        request,
+        build,
+        max_age=settings.leaderboard_refresh_seconds,
+        key=f"leaderboard|{snapshot['refreshed_at']}"
+    )
 
 
 @router.get("/{handle}")
-async def get_user(handle: str):
+async def get_user(handle: str, request: Request) -> Response:
     """Get user by handle from Codeforces API"""
     cf_client = get_cf_client()
 
-    user = await cf_client.get_user_info(handle)
-    if not user:
-        raise HTTPException(status_code=404, detail=f"User '{handle}' not found on Codeforces")
+    async def build() -> Dict[str, Any]:
+        user = await cf_client.get_user_info(handle)
+        if not user:
+            raise HTTPException(status_code=404, detail=f"User '{handle}' not found on Codeforces")
+        return user
 
-    return user
+    return await cached_endpoint_response(request, build, max_age=settings.user_info_cache_ttl_seconds)
 
 
 @router.get("/{handle}/dashboard")
-async def get_dashboard(handle: str) -> Dict[str, Any]:
+async def get_dashboard(handle: str, request: Request) -> Response:
     """Get dashboard data from Codeforces API"""
+    # Stale as soon as either the user info or the rating history may have changed
+    max_age = min(settings.user_info_cache_ttl_seconds, settings.rating_history_cache_ttl_seconds)
+    return await cached_endpoint_response(request, lambda: build_dashboard(handle), max_age=max_age)
+
+
+@router.get("/{handle}/recommendations")
+async def get_recommendations(
+    handle: str,
+    request: Request,
+    limit: int = Query(10, ge=1, le=50, description="Number of problems to recommend")
+) -> Response:
+    """Problems to practice next, scored against the user's rating, weak tags and solves"""
     cf_client = get_cf_client()
+    index = await get_problem_catalog().get_index()
+
+    user, rating_history, solved_sets = await asyncio.gather(
+        cf_client.get_user_info(handle),
+        cf_client.get_user_rating_history(handle),
+        get_solved_service().get(handle, index)
+    )
+    if not user or solved_sets is None:
+        raise HTTPException(status_code=404, detail=f"User '{handle}' not found on Codeforces")
 
-    # Fetch user info and rating history
-    user = await cf_client.get_user_info(handle)
+    recommender = get_recommendation_service()
+    rating = recommender.current_rating(rating_history, user)
+
+    async def build() -> Dict[str, Any]:
+        return {"handle": user["handle"], **recommender.recommend(index, rating, solved_sets, limit)}
+
+    # Exact for the catalogue, the user's submissions and their rating; recomputed when any changes
+    max_age = min(settings.user_status_cache_ttl_seconds, settings.rating_history_cache_ttl_seconds)
+    key = f"{response_cache_key(request)}|v{index.version}|s{solved_sets.generation}|r{rating}"
+    return await cached_endpoint_response(request, build, max_age=max_age, key=key)
+
+
+async def build_dashboard(handle: str) -> Dict[str, Any]:
+    """Assemble dashboard data (user, stats, history and insights) from Codeforces API"""
+    cf_client = get_cf_client()
+
+    # Fetch user info and rating history concurrently, sharing the request's deadline
+    user, rating_history = await asyncio.gather(
+        cf_client.get_user_info(handle),
+        cf_client.get_user_rating_history(handle)
+    )
     if not user:
         raise HTTPException(status_code=404, detail=f"User '{handle}' not found on Codeforces")
 
-    rating_history = await cf_client.get_user_rating_history(handle)
-
     # Calculate stats
     monthly_growth = calculate_monthly_growth(rating_history)
     performance_metrics = calculate_performance_metrics(rating_history)
@@ -6,13 +6,91 @@ class Settings(BaseSettings):
 
     # API Settings
     codeforces_api_base_url: str = "https://codeforces.com/api"
+    codeforces_transport: str = "live"  # live, record or replay
+    codeforces_recordings_dir: str = "recordings"
+
+    # Replay (offline load testing, used when codeforces_transport is "replay")
+    replay_latency_ms: float = 0
+    replay_latency_jitter_ms: float = 0
+    replay_error_rate: float = 0.0  # fraction of requests answered with 503
 
     # Cache Settings
-    cache_ttl_seconds: int = 300  # 5 minutes
+    user_info_cache_ttl_seconds: int = 300  # 5 minutes
+    rating_history_cache_ttl_seconds: int = 900  # minimum time between rating history resyncs
+    rating_history_retention_seconds: int = 2592000  # 30 days
+    rating_update_lag_seconds: int = 21600  # ratings are normally applied within a few hours of a contest ending
+    contest_list_cache_ttl_seconds: int = 60
+    problemset_cache_ttl_seconds: int = 21600  # 6 hours
+    user_status_cache_ttl_seconds: int = 300  # solved/attempted problems of a handle
+    cache_eviction_policy: str = "lru"  # lru or lfu, applied within each namespace's byte budget
+    users_cache_max_bytes: int = 16 * 1024 * 1024
+    ratings_cache_max_bytes: int = 64 * 1024 * 1024
+    problems_cache_max_bytes: int = 64 * 1024 * 1024
+    contests_cache_max_bytes: int = 8 * 1024 * 1024
+    submissions_cache_max_bytes: int = 32 * 1024 * 1024  # solved/attempted id lists and their bitsets
+    stale_grace_seconds: int = 3600  # serve expired entries this long while refreshing or during outages
+    persistent_cache_path: str = "cache.sqlite3"  # SQLite file kept across restarts (empty disables)
+
+    # Response cache (encoded, optionally gzipped response bodies)
+    response_cache_ttl_seconds: int = 30
+    response_cache_max_bytes: int = 32 * 1024 * 1024
+    response_gzip_min_bytes: int = 1024  # smaller bodies are not worth compressing
+
+    # Batching
+    user_info_batch_window_ms: int = 10  # how long to gather handles per user.info call
+    user_info_batch_size: int = 100  # max handles per user.info call
+
+    # Problem catalog
+    problem_catalog_source: str = "mock"  # mock (bundled sample problems) or codeforces (live problemset)
+    problem_search_fuzzy_threshold: float = 0.5  # share of query trigrams a typo match must contain
+
+    # Recommendations
+    recommendation_rating_offset: int = 100  # practice target relative to the current rating
+    recommendation_rating_spread: int = 200  # how quickly the difficulty score falls off around the target
+
+    # Leaderboard
+    leaderboard_handles: str = "tourist,Benq,jiangly,ecnerwala,Um_nik,Petr,maroonrk,ksun48,Radewoosh,mnbvmar"
+    leaderboard_handles_file: str = ""  # optional file with one handle per line
+    leaderboard_refresh_seconds: int = 300  # 5 minutes
+
+    # Startup warmup
+    warmup_enabled: bool = True
+    warmup_handles: str = ""  # comma-separated handles preloaded on startup, in addition to the leaderboard
+    warmup_rating_history: bool = False  # also preload rating histories (one upstream call per handle)
+    warmup_timeout_seconds: float = 30.0  # report ready after this long even if warmup is unfinished
+
+    # HTTP Transport
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 3.0
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 60.0
+    http2_enabled: bool = False  # requires httpx[http2]
+    http_max_retries: int = 2
+    http_retry_backoff_seconds: float = 0.5  # base delay, doubled per retry with full jitter
+    circuit_breaker_failure_threshold: int = 5  # consecutive failures before failing fast
+    circuit_breaker_reset_seconds: float = 30.0
+
+    # Deadlines and hedging
+    request_deadline_seconds: float = 15.0  # total budget per incoming request
+    hedging_enabled: bool = False
+    hedge_percentile: float = 95.0  # send a duplicate once a call is slower than this percentile
 
     # Rate Limiting
     rate_limit_calls: int = 5  # calls per period
     rate_limit_period: float = 1.0  # seconds
+    # File shared by all workers of this app so the limit is global (empty = per process).
+    # Keep it in a directory only the app's user can write to, like the persistent cache
+    rate_limit_shared_state_path: str = "rate_limit.bucket"
+
+    # Inbound rate limiting (per bearer token, or per IP for anonymous clients)
+    inbound_rate_limit_enabled: bool = True
+    inbound_rate_limit_period: float = 60.0  # seconds
+    inbound_rate_limit_execute: int = 10  # /execute runs code, so it gets the smallest quota
+    inbound_rate_limit_users: int = 120  # /users may reach Codeforces
+    inbound_rate_limit_default: int = 300
+    inbound_rate_limit_max_keys: int = 10000  # tracked client buckets before LRU eviction
+    inbound_rate_limit_trusted_proxies: int = 0  # reverse proxies in front that append to X-Forwarded-For (0 ignores it)
 
     # CORS Settings
     cors_origins: str = "http://localhost:5173"
@@ -26,5 +104,20 @@ class Settings(BaseSettings):
         """Get CORS origins as a list"""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def leaderboard_handles_list(self) -> list[str]:
+        """Get leaderboard handles from the handles file if set, else the inline list"""
+        if self.leaderboard_handles_file:
+            with open(self.leaderboard_handles_file) as f:
+                lines = f.read().splitlines()
+        else:
+            lines = self.leaderboard_handles.split(",")
+        return [handle.strip() for handle in lines if handle.strip()]
+
+    @property
+    def warmup_handles_list(self) -> list[str]:
+        """Get extra warmup handles as a list"""
+        return [handle.strip() for handle in self.warmup_handles.split(",") if handle.strip()]
+
 
 settings = Settings()
@@ -1,15 +1,62 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from app.config import settings
 from app.api.v1 import users, problems, auth, execute
+from app.services.codeforces_client import CodeforcesUnavailableError, get_cf_client, close_cf_client
+from app.services.leaderboard_service import get_leaderboard_service
+from app.services.solved_service import get_solved_service
+from app.services.warmup_service import get_warmup_service
+from app.middleware.deadline import DeadlineMiddleware
+from app.middleware.rate_limit import InboundRateLimitMiddleware
+from app.utils.deadline import DeadlineExceeded
+from app.utils.http_cache import get_response_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the Codeforces transport and start background jobs; tear down in reverse"""
+    get_cf_client()
+    # Warmup starts first so the leaderboard loop's first refresh joins the warmup one
+    warmup_service = get_warmup_service()
+    warmup_service.start()
+    leaderboard_service = get_leaderboard_service()
+    leaderboard_service.start()
+    yield
+    await warmup_service.stop()
+    await leaderboard_service.stop()
+    await close_cf_client()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Codeforces Redesign API",
     description="Modern API for Codeforces contest dashboards and problem browsing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+# Per-client quotas (added before CORS so that 429 responses still carry CORS headers)
+if settings.inbound_rate_limit_enabled:
+    app.add_middleware(
+        InboundRateLimitMiddleware,
+        quotas={
+            "execute": settings.inbound_rate_limit_execute,
+            "users": settings.inbound_rate_limit_users,
+            "default": settings.inbound_rate_limit_default,
+        },
+        endpoint_classes=[
+            ("/api/v1/execute", "execute"),
+            ("/api/v1/users", "users"),
+        ],
+        period=settings.inbound_rate_limit_period,
+        max_keys=settings.inbound_rate_limit_max_keys,
+        exempt_paths=("/", "/health", "/docs", "/redoc", "/openapi.json"),
+        trusted_proxies=settings.inbound_rate_limit_trusted_proxies
+    )
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +66,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bound the time each request may spend waiting on Codeforces
+app.add_middleware(DeadlineMiddleware, timeout=settings.request_deadline_seconds)
+
+
+@app.exception_handler(CodeforcesUnavailableError)
+async def codeforces_unavailable_handler(request: Request, exc: CodeforcesUnavailableError):
+    """Report upstream outages as 503 instead of a misleading 404"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Codeforces API is currently unavailable, please retry later"},
+        headers={"Retry-After": "30"}
+    )
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    """Report requests that ran out of time budget as 504"""
+    return JSONResponse(
+        status_code=504,
+        content={"detail": "Timed out waiting for the Codeforces API"}
+    )
+
+
 # Register API routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
@@ -38,5 +108,21 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Health check endpoint; 503 until the startup warmup has finished or timed out"""
+    warmup_service = get_warmup_service()
+    if not warmup_service.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up", "warmup": warmup_service.status()}
+        )
+    return {"status": "healthy", "warmup": warmup_service.status()}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Per-namespace cache hit, miss, eviction and memory counters"""
+    return {
+        "codeforces": get_cf_client().cache_stats(),
+        "responses": get_response_cache().stats(),
+        "solved_sets": get_solved_service().stats(),
+    }
@@ -0,0 +1,25 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.utils.deadline import deadline_scope
+
+
+class DeadlineMiddleware:
+    """Give every HTTP request a time budget that bounds its upstream calls"""
+
+    def __init__(self, app: ASGIApp, timeout: float):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI app
+            timeout: Seconds each request may spend in total
+        """
+        self.app = app
+        self.timeout = timeout
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(self.timeout):
+            await self.app(scope, receive, send)
@@ -0,0 +1,129 @@
+import json
+import math
+from typing import Dict, List, Optional, Tuple
+from cachetools import LRUCache
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.services.auth import verify_token
+from app.utils.rate_limiter import RateLimiter
+
+
+class InboundRateLimitMiddleware:
+    """
+    Per-client request quotas for the API.
+
+    Every request counts against its IP address; requests with a valid
+    bearer token also count against the token's user, so one account cannot
+    spread load over many addresses. Unverified tokens are ignored, so they
+    neither dodge the IP quota nor create buckets. Each client gets one
+    sliding-window RateLimiter per endpoint class; the least recently seen
+    clients are evicted once max_keys buckets are tracked. Requests over
+    either quota get 429 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        quotas: Dict[str, int],
+        endpoint_classes: List[Tuple[str, str]],
+        period: float = 60.0,
+        max_keys: int = 10000,
+        exempt_paths: Tuple[str, ...] = (),
+        trusted_proxies: int = 0
+    ):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI app
+            quotas: Requests allowed per period for each endpoint class (must include "default")
+            endpoint_classes: (path prefix, class) pairs, checked in order
+            period: Quota window in seconds
+            max_keys: Maximum number of (client, class) buckets kept in memory
+            exempt_paths: Paths that are never limited
+            trusted_proxies: Number of reverse proxies in front of the app that
+                append to X-Forwarded-For; the client IP is the address the
+                outermost of them added (0 ignores the header)
+        """
+        self.app = app
+        self.quotas = quotas
+        self.endpoint_classes = endpoint_classes
+        self.period = period
+        self.exempt_paths = exempt_paths
+        self.trusted_proxies = trusted_proxies
+        self.buckets: LRUCache = LRUCache(maxsize=max_keys)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint_class = self._endpoint_class(scope["path"])
+        for client_key in self._client_keys(scope):
+            retry_after = self._bucket(client_key, endpoint_class).try_acquire()
+            if retry_after > 0:
+                await self._reject(send, endpoint_class, retry_after)
+                return
+
+        await self.app(scope, receive, send)
+
+    def _endpoint_class(self, path: str) -> str:
+        """Endpoint class of a path"""
+        for prefix, endpoint_class in self.endpoint_classes:
+            if path.startswith(prefix):
+                return endpoint_class
+        return "default"
+
+    def _bucket(self, client_key: str, endpoint_class: str) -> RateLimiter:
+        """Rate limiter of a client for an endpoint class, created on first use"""
+        key = (client_key, endpoint_class)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = RateLimiter(max_calls=self.quotas[endpoint_class], period=self.period)
+            self.buckets[key] = bucket
+        return bucket
+
+    def _client_keys(self, scope: Scope) -> List[str]:
+        """Keys a request counts against: the verified token's user (if any), then the client IP"""
+        headers = dict(scope["headers"])
+        keys = []
+
+        authorization = headers.get(b"authorization", b"")
+        if authorization.startswith(b"Bearer "):
+            payload = verify_token(authorization[7:].decode("latin-1"))
+            if payload and payload.get("sub"):
+                keys.append(f"user:{payload['sub']}")
+
+        keys.append(f"ip:{self._client_ip(scope, headers) or 'unknown'}")
+        return keys
+
+    def _client_ip(self, scope: Scope, headers: Dict[bytes, bytes]) -> Optional[str]:
+        """
+        Client IP address.
+
+        Behind trusted proxies, each appends the address it received the
+        request from to X-Forwarded-For, so the client is the entry the
+        outermost proxy added, trusted_proxies from the right. Anything to
+        its left was sent by the client and is ignored.
+        """
+        if self.trusted_proxies > 0 and b"x-forwarded-for" in headers:
+            addresses = [a.strip() for a in headers[b"x-forwarded-for"].decode("latin-1").split(",")]
+            if len(addresses) >= self.trusted_proxies and addresses[-self.trusted_proxies]:
+                return addresses[-self.trusted_proxies]
+        if scope.get("client"):
+            return scope["client"][0]
+        return None
+
+    async def _reject(self, send: Send, endpoint_class: str, retry_after: float) -> None:
+        """Send a 429 response"""
+        body = json.dumps({"detail": "Too many requests, please slow down"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+                (b"x-ratelimit-limit", str(self.quotas[endpoint_class]).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,83 +1,823 @@
+import asyncio
+import random
+import re
+import sqlite3
+import time
+from collections import defaultdict
 import httpx
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable, AsyncIterator, Tuple
 import logging
+from app.config import settings
+from app.services.codeforces_replay import RecordingTransport, ReplayTransport
+from app.utils.batcher import MicroBatcher
+from app.utils.cache import CacheEntry, CacheNamespace, NamespacedCache
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.deadline import DeadlineExceeded, check_deadline, deadline_scope, remaining, within_deadline
+from app.utils.json_stream import JSONStreamParser, Path
+from app.utils.latency import LatencyTracker
+from app.utils.persistent_cache import PersistentCache
+from app.utils.rate_limiter import Priority, PriorityRateLimiter, current_priority, request_priority
+from app.utils.singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# user.info names the first unknown handle when a multi-handle lookup fails
+NOT_FOUND_HANDLE_RE = re.compile(r"User with handle (\S+) not found")
+# Anything else cannot exist upstream, and a ";" would split a user.info batch
+HANDLE_RE = re.compile(r"^[A-Za-z0-9_.-]{3,24}$")
+# Unknown handles dropped from one user.info batch before it is split instead
+MAX_NOT_FOUND_RETRIES = 2
+
+# Arrays streamed out of bulk responses
+RESULT_PATH: Path = ("result",)
+PROBLEMS_PATH: Path = ("result", "problems")
+PROBLEM_STATISTICS_PATH: Path = ("result", "problemStatistics")
+
+# Upstream statuses worth retrying (overload, gateway trouble, maintenance)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CodeforcesUnavailableError(Exception):
+    """Raised when Codeforces cannot be reached and no cached data can stand in"""
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled HTTP client used for Codeforces calls.
+
+    settings.codeforces_transport selects where requests go: "live" (the
+    network), "record" (the network, saving responses) or "replay" (recorded
+    or mock responses, no network).
+    """
+    if settings.codeforces_transport == "replay":
+        transport = ReplayTransport(
+            recordings_dir=settings.codeforces_recordings_dir,
+            latency_ms=settings.replay_latency_ms,
+            latency_jitter_ms=settings.replay_latency_jitter_ms,
+            error_rate=settings.replay_error_rate
+        )
+    else:
+        http2 = settings.http2_enabled
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("http2_enabled is set but the h2 package is missing (pip install httpx[http2]); using HTTP/1.1")
+                http2 = False
+
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds
+            ),
+            http2=http2
+        )
+        if settings.codeforces_transport == "record":
+            transport = RecordingTransport(transport, settings.codeforces_recordings_dir)
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+        transport=transport
+    )
+
+
 class CodeforcesClient:
     """Client for Codeforces API"""
 
-    BASE_URL = "https://codeforces.com/api"
-
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None, base_url: Optional[str] = None):
+        self.base_url = (base_url or settings.codeforces_api_base_url).rstrip("/")
+        self.client = http_client or create_http_client()
+        self._latency: Dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+        self._breaker = CircuitBreaker(
+            failure_threshold=settings.circuit_breaker_failure_threshold,
+            reset_timeout=settings.circuit_breaker_reset_seconds
+        )
+        # Entries outlive their TTL by the grace window so they can be served stale
+        grace = settings.stale_grace_seconds
+        policy = settings.cache_eviction_policy
+        self._caches = NamespacedCache()
+        self._user_cache = self._caches.add(
+            "users", settings.user_info_cache_ttl_seconds + grace, settings.users_cache_max_bytes, policy
+        )
+        # Rating histories only grow, so they are kept long and resynced when contests finish
+        self._rating_cache = self._caches.add(
+            "ratings", settings.rating_history_retention_seconds, settings.ratings_cache_max_bytes, policy
+        )
+        self._problemset_cache = self._caches.add(
+            "problems", settings.problemset_cache_ttl_seconds + grace, settings.problems_cache_max_bytes, policy
+        )
+        self._contest_cache = self._caches.add(
+            "contests", settings.contest_list_cache_ttl_seconds + grace, settings.contests_cache_max_bytes, policy
+        )
+        self._status_cache = self._caches.add(
+            "submissions", settings.user_status_cache_ttl_seconds + grace, settings.submissions_cache_max_bytes, policy
+        )
+        self._latest_finished_end: Optional[tuple] = None
+        # Optional on-disk copy so a restarted process starts warm
+        self._store = PersistentCache(settings.persistent_cache_path) if settings.persistent_cache_path else None
+        self._inflight = SingleFlight()
+        self._rate_limiter = PriorityRateLimiter(
+            max_calls=settings.rate_limit_calls,
+            period=settings.rate_limit_period,
+            shared_state_path=settings.rate_limit_shared_state_path
+        )
+        # One batcher per priority class so interactive lookups never ride in a background batch
+        self._user_batchers = {
+            priority: MicroBatcher(
+                self._fetch_users_info,
+                window=settings.user_info_batch_window_ms / 1000,
+                max_size=settings.user_info_batch_size
+            )
+            for priority in Priority
+        }
 
     async def get_user_info(self, handle: str) -> Optional[Dict[str, Any]]:
-        """Get user info from Codeforces API"""
-        try:
-            url = f"{self.BASE_URL}/user.info?handles={handle}"
-            response = await self.client.get(url)
-            response.raise_for_status()
+        """
+        Get user info, served from cache when possible.
 
-            data = response.json()
-            if data.get("status") != "OK":
-                logger.error(f"CF API error: {data.get('comment')}")
-                return None
+        Returns None when the handle does not exist or is not a valid handle.
 
-            if not data.get("result") or len(data["result"]) == 0:
-                return None
-
-            user = data["result"][0]
-
-            # Transform to our format
-            return {
-                "handle": user.get("handle", handle),
-                "rating": user.get("rating", 0),
-                "maxRating": user.get("maxRating", 0),
-                "rank": user.get("rank", "unrated"),
-                "maxRank": user.get("maxRank", "unrated"),
-                "avatar": user.get("titlePhoto", f"https://ui-avatars.com/api/?name={handle}&background=random&color=fff"),
-                "contribution": user.get("contribution", 0),
-                "friendOfCount": user.get("friendOfCount", 0),
-            }
-        except Exception as e:
-            logger.error(f"Error fetching user {handle}: {e}")
+        Raises:
+            CodeforcesUnavailableError: Codeforces failed and nothing is cached
+        """
+        if not HANDLE_RE.match(handle):
             return None
+        return await self._get_cached(
+            "user.info",
+            self._user_cache,
+            handle.lower(),
+            settings.user_info_cache_ttl_seconds,
+            lambda: self._fetch_user_info(handle)
+        )
 
     async def get_user_rating_history(self, handle: str) -> List[Dict[str, Any]]:
-        """Get user rating history from Codeforces API"""
+        """
+        Get user rating history, served from cache when possible.
+
+        A stored history stays current until a rated contest could have
+        changed it: it is resynced only when contest.list shows a contest that
+        finished after (or shortly before) the last sync, and then only the
+        new rows are transformed and appended.
+
+        Raises:
+            CodeforcesUnavailableError: Codeforces failed and nothing is cached
+        """
+        key = handle.lower()
+
+        async def fetch() -> List[Dict[str, Any]]:
+            previous = self._rating_cache.peek(key)
+            return await self._fetch_user_rating_history(handle, previous.value if previous else None)
+
+        history = await self._get_cached(
+            "user.rating",
+            self._rating_cache,
+            key,
+            settings.rating_history_cache_ttl_seconds,
+            fetch,
+            is_fresh=self._rating_history_is_current
+        )
+        return history if history is not None else []
+
+    async def get_contest_list(self) -> List[Dict[str, Any]]:
+        """
+        Get the list of (non-gym) contests, served from cache when possible.
+
+        Raises:
+            CodeforcesUnavailableError: Codeforces failed and nothing is cached
+        """
+        return await self._get_cached(
+            "contest.list",
+            self._contest_cache,
+            "all",
+            settings.contest_list_cache_ttl_seconds,
+            self._fetch_contest_list
+        )
+
+    async def get_problemset(self) -> List[Dict[str, Any]]:
+        """
+        Get the full problemset joined with solve counts, served from cache when possible.
+
+        Raises:
+            CodeforcesUnavailableError: Codeforces failed and nothing is cached
+        """
+        return await self._get_cached(
+            "problemset.problems",
+            self._problemset_cache,
+            "all",
+            settings.problemset_cache_ttl_seconds,
+            self._fetch_problemset
+        )
+
+    async def get_user_problem_status(self, handle: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Get the problems a user solved or attempted, served from cache when possible.
+
+        Returns None when the handle does not exist.
+
+        Returns:
+            {"solved": [problem ids], "attempted": [ids tried but never accepted]}
+
+        Raises:
+            CodeforcesUnavailableError: Codeforces failed and nothing is cached
+        """
+        return await self._get_cached(
+            "user.status",
+            self._status_cache,
+            handle.lower(),
+            settings.user_status_cache_ttl_seconds,
+            lambda: self._fetch_user_problem_status(handle)
+        )
+
+    async def get_users_info(self, handles: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get user info for many handles at once.
+
+        Lookups go through the same cache and batcher as get_user_info, so
+        they are packed into multi-handle user.info requests. Handles that
+        cannot be loaded because Codeforces is unavailable (or the request
+        deadline ran out) map to None.
+
+        Returns:
+            Dictionary mapping each requested handle to its user (or None)
+        """
+        users = await asyncio.gather(
+            *(self.get_user_info(handle) for handle in handles),
+            return_exceptions=True
+        )
+
+        result = {}
+        for handle, user in zip(handles, users):
+            if isinstance(user, (CodeforcesUnavailableError, DeadlineExceeded)):
+                user = None
+            elif isinstance(user, BaseException):
+                raise user
+            result[handle] = user
+        return result
+
+    async def _get_cached(
+        self,
+        namespace: str,
+        cache: CacheNamespace,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        is_fresh: Optional[Callable[[CacheEntry], Awaitable[bool]]] = None
+    ) -> Any:
+        """
+        Serve a value with stale-while-revalidate semantics.
+
+        Fresh entries (younger than ttl, or accepted by is_fresh) are
+        returned as is. Other cached entries are returned immediately while a
+        background refresh runs; if that refresh fails the stale entry keeps
+        being served until the cache drops it. Memory misses fall back to the
+        persistent store before going upstream. Upstream loads wait for the
+        call, and concurrent loads for the same key and priority class share
+        one call.
+
+        Args:
+            namespace: Name of the upstream method, used in single-flight keys
+            cache: Cache holding CacheEntry objects for this method
+            key: Cache key
+            ttl: Seconds an entry is considered fresh
+            fetch: Coroutine factory loading the value (None means "not found")
+            is_fresh: Optional async check replacing the plain age test
+        """
+        entry = cache.get(key)
+        if entry is None and self._store is not None:
+            entry = await asyncio.to_thread(self._store.get, namespace, key)
+            if entry is not None:
+                # Keeps aging from when it was fetched, not from when it was loaded
+                cache.set(key, entry, expires_at=entry.stored_at + cache.ttl)
+
+        if entry is not None:
+            fresh = await is_fresh(entry) if is_fresh else time.time() - entry.stored_at < ttl
+            if not fresh:
+                self._revalidate(namespace, cache, key, fetch)
+            return entry.value
+
+        # The shared load runs without a deadline; every caller bounds its own wait
+        return await within_deadline(self._inflight.do(
+            (namespace, key, current_priority()),
+            lambda: self._load(namespace, cache, key, fetch)
+        ))
+
+    def _revalidate(
+        self,
+        namespace: str,
+        cache: CacheNamespace,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Refresh a stale entry in the background at background priority"""
+
+        async def run() -> None:
+            try:
+                await self._inflight.do(
+                    (namespace, key, Priority.BACKGROUND),
+                    lambda: self._load(namespace, cache, key, fetch)
+                )
+            except Exception as e:
+                logger.warning(f"Serving stale {namespace} for {key}, refresh failed: {e}")
+
+        # Not bound by the deadline of the request that noticed the stale entry
+        with request_priority(Priority.BACKGROUND), deadline_scope(None):
+            asyncio.ensure_future(run())
+
+    async def _load(
+        self,
+        namespace: str,
+        cache: CacheNamespace,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Fetch a value and cache it (in memory and on disk) unless it is None"""
+        value = await fetch()
+        if value is None:
+            return value
+
+        entry = CacheEntry(value)
+        cache.set(key, entry)
+        if self._store is not None:
+            try:
+                await asyncio.to_thread(
+                    self._store.set, namespace, key, entry, cache.ttl
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist {namespace} for {key}: {e}")
+        return value
+
+    async def _fetch_user_info(self, handle: str) -> Optional[Dict[str, Any]]:
+        """Fetch user info through the user.info batcher"""
+        return await self._user_batchers[current_priority()].load(handle.lower())
+
+    async def _fetch_users_info(self, handles: List[str]) -> Dict[str, Any]:
+        """
+        Fetch many users with semicolon-joined user.info requests.
+
+        Codeforces fails the whole request when one handle does not exist, so
+        unknown handles named in the error comment are dropped and the rest
+        retried, a few times. After that, or when the failure names no handle,
+        the batch is split in half so one bad handle cannot fail the others.
+
+        Args:
+            handles: Lowercased handles to fetch
+
+        Returns:
+            Dictionary mapping lowercased handle to user; missing handles are
+            omitted and a handle that failed on its own maps to a
+            CodeforcesUnavailableError
+
+        Raises:
+            CodeforcesUnavailableError: Codeforces could not be reached
+        """
+        remaining = list(handles)
+        dropped = 0
+        while remaining:
+            url = f"{self.base_url}/user.info"
+            data = await self._get_json(url, params={"handles": ";".join(remaining)})
+
+            if data.get("status") == "OK":
+                return {
+                    user["handle"].lower(): self._transform_user(user, user["handle"])
+                    for user in data.get("result", [])
+                }
+
+            comment = data.get("comment") or ""
+            match = NOT_FOUND_HANDLE_RE.search(comment)
+            if not match or match.group(1).lower() not in remaining:
+                if len(remaining) == 1:
+                    logger.error(f"CF API error for {remaining[0]}: {comment}")
+                    return {remaining[0]: CodeforcesUnavailableError(comment)}
+                break
+
+            remaining.remove(match.group(1).lower())
+            dropped += 1
+            if dropped >= MAX_NOT_FOUND_RETRIES and len(remaining) > 1:
+                break
+
+        if not remaining:
+            return {}
+
+        middle = len(remaining) // 2
+        first, second = await asyncio.gather(
+            self._fetch_users_info(remaining[:middle]),
+            self._fetch_users_info(remaining[middle:])
+        )
+        return {**first, **second}
+
+    @staticmethod
+    def _transform_user(user: Dict[str, Any], handle: str) -> Dict[str, Any]:
+        """Transform a Codeforces user object to our format"""
+        return {
+            "handle": user.get("handle", handle),
+            "rating": user.get("rating", 0),
+            "maxRating": user.get("maxRating", 0),
+            "rank": user.get("rank", "unrated"),
+            "maxRank": user.get("maxRank", "unrated"),
+            "avatar": user.get("titlePhoto", f"https://ui-avatars.com/api/?name={handle}&background=random&color=fff"),
+            "contribution": user.get("contribution", 0),
+            "friendOfCount": user.get("friendOfCount", 0),
+        }
+
+    async def _rating_history_is_current(self, entry: CacheEntry) -> bool:
+        """
+        Check whether a stored rating history can still be served as is.
+
+        Histories are resynced at most every rating_history_cache_ttl_seconds,
+        and then only if the latest finished contest may be missing from this
+        handle's history: it ended after the history's last rating update
+        (ratings are applied after a contest ends, so earlier contests are
+        reflected already) and less than rating_update_lag_seconds before
+        the last sync (a sync after that has seen its final ratings). So a
+        history is rechecked only during the hours after a contest the user
+        has not yet been rated in. If contest.list is unavailable the plain
+        TTL applies.
+        """
+        if time.time() - entry.stored_at < settings.rating_history_cache_ttl_seconds:
+            return True
+
         try:
-            url = f"{self.BASE_URL}/user.rating?handle={handle}"
-            response = await self.client.get(url)
-            response.raise_for_status()
+            contests = await self.get_contest_list()
+        except CodeforcesUnavailableError:
+            return False
+
+        history = entry.value or []
+        reflected_until = history[-1].get("ratingUpdateTimeSeconds") or 0 if history else 0
+        settled_until = entry.stored_at - settings.rating_update_lag_seconds
+        return self._latest_finished_contest_end(contests) <= max(reflected_until, settled_until)
+
+    def _latest_finished_contest_end(self, contests: List[Dict[str, Any]]) -> int:
+        """End time of the most recently finished contest, memoized per contest list"""
+        if self._latest_finished_end is None or self._latest_finished_end[0] is not contests:
+            latest = max(
+                (
+                    (contest.get("startTimeSeconds") or 0) + (contest.get("durationSeconds") or 0)
+                    for contest in contests
+                    if contest.get("phase") == "FINISHED"
+                ),
+                default=0
+            )
+            self._latest_finished_end = (contests, latest)
+        return self._latest_finished_end[1]
+
+    async def _fetch_contest_list(self) -> List[Dict[str, Any]]:
+        """
+        Fetch contest.list from Codeforces API.
+
+        Raises:
+            CodeforcesUnavailableError: The request failed
+        """
+        url = f"{self.base_url}/contest.list"
+        data = await self._get_json(url, params={"gym": "false"})
+        if data.get("status") != "OK":
+            logger.error(f"CF API error: {data.get('comment')}")
+            raise CodeforcesUnavailableError(data.get("comment") or "")
+
+        # Transform to our format
+        return [
+            {
+                "id": contest.get("id"),
+                "name": contest.get("name"),
+                "type": contest.get("type"),
+                "phase": contest.get("phase"),
+                "startTimeSeconds": contest.get("startTimeSeconds"),
+                "durationSeconds": contest.get("durationSeconds"),
+            }
+            for contest in data.get("result", [])
+        ]
+
+    async def _fetch_user_rating_history(
+        self,
+        handle: str,
+        previous: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch user rating history from Codeforces API.
 
-            data = response.json()
-            if data.get("status") != "OK":
+        Unknown handles yield an empty history. When a previously synced
+        history is given and is still a prefix of the upstream one, only the
+        new rows are transformed and appended to it.
+
+        Raises:
+            CodeforcesUnavailableError: The request failed for any other reason
+        """
+        url = f"{self.base_url}/user.rating"
+        data = await self._get_json(url, params={"handle": handle})
+        if data.get("status") != "OK":
+            comment = data.get("comment") or ""
+            if NOT_FOUND_HANDLE_RE.search(comment):
                 return []
+            logger.error(f"CF API error: {comment}")
+            raise CodeforcesUnavailableError(comment)
 
-            changes = data.get("result", [])
-
-            # Transform to our format
-            return [
-                {
-                    "contestId": change.get("contestId"),
-                    "contestName": change.get("contestName"),
-                    "handle": handle,
-                    "rank": change.get("rank"),
-                    "ratingUpdateTimeSeconds": change.get("ratingUpdateTimeSeconds"),
-                    "oldRating": change.get("oldRating"),
-                    "newRating": change.get("newRating"),
-                    "rating_change": change.get("newRating", 0) - change.get("oldRating", 0)
-                }
-                for change in changes
-            ]
-        except Exception as e:
-            logger.error(f"Error fetching rating history for {handle}: {e}")
-            return []
+        changes = data.get("result", [])
+
+        # Rating history is append-only; rebuild only if it was rewritten (e.g. rating rollbacks)
+        if (
+            previous
+            and len(changes) >= len(previous)
+            and changes[len(previous) - 1].get("ratingUpdateTimeSeconds") == previous[-1]["ratingUpdateTimeSeconds"]
+        ):
+            return previous + [self._transform_rating_change(change, handle) for change in changes[len(previous):]]
+
+        return [self._transform_rating_change(change, handle) for change in changes]
+
+    @staticmethod
+    def _transform_rating_change(change: Dict[str, Any], handle: str) -> Dict[str, Any]:
+        """Transform a Codeforces rating change object to our format"""
+        return {
+            "contestId": change.get("contestId"),
+            "contestName": change.get("contestName"),
+            "handle": handle,
+            "rank": change.get("rank"),
+            "ratingUpdateTimeSeconds": change.get("ratingUpdateTimeSeconds"),
+            "oldRating": change.get("oldRating"),
+            "newRating": change.get("newRating"),
+            "rating_change": change.get("newRating", 0) - change.get("oldRating", 0)
+        }
+
+    async def _fetch_problemset(self) -> List[Dict[str, Any]]:
+        """
+        Fetch problemset.problems and join each problem with its solve count.
+
+        The response (~10k problems plus statistics) is streamed: problems are
+        transformed as they arrive and statistics are applied in place, so the
+        raw payload is never held in memory alongside the result.
+
+        Raises:
+            CodeforcesUnavailableError: The request failed
+        """
+        url = f"{self.base_url}/problemset.problems"
+        problems: List[Dict[str, Any]] = []
+        by_key: Dict[tuple, Dict[str, Any]] = {}
+
+        async for path, item in self._stream_result(url, None, [PROBLEMS_PATH, PROBLEM_STATISTICS_PATH]):
+            if path == PROBLEMS_PATH:
+                problem = self._transform_problem(item, 0)
+                problems.append(problem)
+                by_key[(problem["contestId"], problem["index"])] = problem
+            else:
+                problem = by_key.get((item.get("contestId"), item.get("index")))
+                if problem is not None:
+                    problem["solved_count"] = item.get("solvedCount", 0)
+
+        return problems
+
+    async def _fetch_user_problem_status(self, handle: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Fetch user.status and reduce the submissions to solved and attempted problem ids.
+
+        Active users have tens of thousands of submissions; they are streamed
+        and folded into two id sets as they arrive, so only the ids are kept.
+        Unknown handles yield None.
+
+        Raises:
+            CodeforcesUnavailableError: The request failed for any other reason
+        """
+        url = f"{self.base_url}/user.status"
+        solved = set()
+        attempted = set()
+        try:
+            async for _, submission in self._stream_result(url, {"handle": handle}, [RESULT_PATH]):
+                problem = submission.get("problem") or {}
+                if problem.get("contestId") is None:
+                    continue
+                problem_id = f"{problem['contestId']}{problem.get('index', '')}"
+                if submission.get("verdict") == "OK":
+                    solved.add(problem_id)
+                else:
+                    attempted.add(problem_id)
+        except CodeforcesUnavailableError as e:
+            if NOT_FOUND_HANDLE_RE.search(str(e)):
+                return None
+            raise
+
+        return {"solved": sorted(solved), "attempted": sorted(attempted - solved)}
+
+    @staticmethod
+    def _transform_problem(problem: Dict[str, Any], solved_count: int) -> Dict[str, Any]:
+        """Transform a Codeforces problem object to our format"""
+        return {
+            "id": f"{problem.get('contestId', '')}{problem.get('index', '')}",
+            "contestId": problem.get("contestId"),
+            "index": problem.get("index"),
+            "name": problem.get("name"),
+            "rating": problem.get("rating"),
+            "tags": problem.get("tags", []),
+            "solved_count": solved_count,
+        }
+
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        GET a Codeforces API method and decode its JSON envelope.
+
+        Codeforces reports bad arguments (such as unknown handles) as 400 with
+        a FAILED payload, which is returned for the caller to inspect.
+
+        Raises:
+            CodeforcesUnavailableError: Transport error, other HTTP error, invalid JSON
+                or open circuit
+        """
+        try:
+            response = await self._get(url, params=params)
+            if response.status_code != 400:
+                response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError, CircuitOpenError) as e:
+            logger.error(f"Error calling {url}: {e}")
+            raise CodeforcesUnavailableError(str(e)) from e
+
+    async def _stream_result(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        array_paths: List[Path]
+    ) -> AsyncIterator[Tuple[Path, Any]]:
+        """
+        Stream the items of arrays inside a Codeforces response.
+
+        Yields (path, item) for each item of the arrays at array_paths while
+        the body is still downloading, instead of decoding it all at once.
+
+        Raises:
+            CodeforcesUnavailableError: Transport error, HTTP error, invalid JSON or FAILED status
+        """
+        status = None
+        comment = None
+        try:
+            response = await self._get(url, params=params, stream=True)
+            try:
+                if response.status_code != 400:
+                    response.raise_for_status()
+
+                async for path, value in JSONStreamParser(response.aiter_text(), array_paths):
+                    if path == ("status",):
+                        status = value
+                    elif path == ("comment",):
+                        comment = value
+                    elif path in array_paths:
+                        yield path, value
+            finally:
+                await response.aclose()
+        except (httpx.HTTPError, ValueError, CircuitOpenError) as e:
+            logger.error(f"Error streaming {url}: {e}")
+            raise CodeforcesUnavailableError(str(e)) from e
+
+        if status != "OK":
+            logger.error(f"CF API error: {comment}")
+            raise CodeforcesUnavailableError(comment or "")
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """
+        Send a GET request through the circuit breaker, rate limiter and retry policy.
+
+        Transport errors and retryable statuses are retried up to
+        http_max_retries times with full-jitter exponential backoff, each
+        attempt taking a new rate limiter slot. Every failed attempt counts
+        towards opening the circuit; while it is open calls fail immediately.
+        Waits, attempt timeouts and retries are all cut short by the current
+        request deadline, if any.
+
+        Args:
+            url: Request URL
+            params: Query parameters
+            stream: Return before reading the body (caller must aclose() the response)
+
+        Returns:
+            The last response (it may still carry an error status)
+
+        Raises:
+            CircuitOpenError: The circuit is open
+            DeadlineExceeded: The request deadline ran out
+            httpx.TransportError: The last attempt failed to connect or read
+        """
+        method = url.rsplit("/", 1)[-1]
+        attempts = settings.http_max_retries + 1
+
+        for attempt in range(attempts):
+            check_deadline()
+            self._breaker.raise_if_open()
+            await within_deadline(self._rate_limiter.acquire())
+            # Taken only once a slot is ours, so no trial is held while queued
+            is_trial = self._breaker.check()
+
+            timeout = settings.http_timeout_seconds
+            left = remaining()
+            if left is not None and left < timeout:
+                timeout = left
+
+            try:
+                if stream:
+                    request = self._build_request(url, params, timeout)
+                    response = await self.client.send(request, stream=True)
+                else:
+                    response = await self._send_hedged(method, url, params, timeout)
+            except httpx.TimeoutException:
+                if timeout < settings.http_timeout_seconds:
+                    # Our own budget ran out; that says nothing about upstream health
+                    raise DeadlineExceeded("Request deadline exceeded") from None
+                self._breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                response = None
+            except httpx.TransportError:
+                self._breaker.record_failure()
+                if attempt == attempts - 1:
+                    raise
+                response = None
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self._breaker.record_success()
+                    return response
+                self._breaker.record_failure()
+                if attempt == attempts - 1:
+                    return response
+            finally:
+                # Cancellation and deadline exits report no outcome; free the trial for the next call
+                if is_trial:
+                    self._breaker.release_trial()
+
+            backoff = random.uniform(0, settings.http_retry_backoff_seconds * 2 ** attempt)
+            left = remaining()
+            if left is not None and backoff >= left:
+                if response is not None:
+                    return response
+                raise DeadlineExceeded("Request deadline exceeded")
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(backoff)
+
+    def _build_request(self, url: str, params: Optional[Dict[str, Any]], timeout: float) -> httpx.Request:
+        """Build a GET request with the given overall timeout"""
+        return self.client.build_request(
+            "GET",
+            url,
+            params=params,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, settings.http_connect_timeout_seconds))
+        )
+
+    async def _send_hedged(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        timeout: float
+    ) -> httpx.Response:
+        """
+        Send a request, hedging it if it runs slower than usual.
+
+        When hedging is enabled and the request has not answered by the
+        method's hedge_percentile latency, a duplicate is sent if the rate
+        limiter has a free slot right now. The first response wins and the
+        other request is cancelled.
+        """
+        tracker = self._latency[method]
+        hedge_after = tracker.percentile(settings.hedge_percentile) if settings.hedging_enabled else None
+
+        started = {}
+
+        def send(timeout: float) -> asyncio.Task:
+            task = asyncio.ensure_future(self.client.send(self._build_request(url, params, timeout)))
+            started[task] = time.monotonic()
+            return task
+
+        primary = send(timeout)
+        pending = {primary}
+        try:
+            if hedge_after is not None and hedge_after < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done and self._rate_limiter.try_acquire():
+                    pending.add(send(timeout - hedge_after))
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        tracker.record(time.monotonic() - started[task])
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit, miss, eviction and memory counters of the in-memory caches"""
+        return self._caches.stats()
 
     async def close(self):
-        """Close the HTTP client"""
+        """Close the HTTP client, the persistent store and the shared rate limit state"""
         await self.client.aclose()
+        self._rate_limiter.close()
+        if self._store is not None:
+            self._store.close()
 
 # Singleton instance
 _cf_client: Optional[CodeforcesClient] = None
@@ -88,3 +828,10 @@ def get_cf_client() -> CodeforcesClient:
     if _cf_client is None:
         _cf_client = CodeforcesClient()
     return _cf_client
+
+async def close_cf_client() -> None:
+    """Close the Codeforces client singleton (called on app shutdown)"""
+    global _cf_client
+    if _cf_client is not None:
+        await _cf_client.close()
+        _cf_client = None
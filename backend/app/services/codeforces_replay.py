@@ -0,0 +1,362 @@
+"""
+Offline stand-in for the Codeforces API.
+
+ReplayTransport answers Codeforces API requests from recorded responses
+(falling back to the mock data in app.data), with configurable latency and
+error injection. RecordingTransport wraps the real transport and saves every
+successful response so it can be replayed later. Both plug into httpx, so
+CodeforcesClient runs its normal code paths (batching, streaming, retries)
+against them.
+
+The same replay data can also be served over HTTP for other processes:
+
+    python -m app.services.codeforces_replay --port 8001
+
+and pointed at with CODEFORCES_API_BASE_URL=http://localhost:8001/api.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+import httpx
+from app.data.mock_problems import MOCK_PROBLEMS
+from app.data.mock_users import MOCK_USERS
+
+logger = logging.getLogger(__name__)
+
+# Problem ids in the mock catalogue look like "12B"
+MOCK_PROBLEM_ID_RE = re.compile(r"^(\d+)([A-Z]\d?)$")
+
+
+def _method_name(request: httpx.Request) -> str:
+    """API method of a request, e.g. "user.info" for /api/user.info"""
+    return request.url.path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def _recording_key(params: Dict[str, str]) -> str:
+    """Stable, filesystem-safe file name for a set of query parameters"""
+    key = urlencode(sorted(params.items()))
+    return re.sub(r"[^A-Za-z0-9_.=&-]", "_", key) or "_"
+
+
+def _json_response(status_code: int, payload: Dict[str, Any]) -> httpx.Response:
+    """Build a JSON response"""
+    return httpx.Response(
+        status_code,
+        content=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json;charset=UTF-8"}
+    )
+
+
+def _failed(comment: str) -> httpx.Response:
+    """Codeforces-style FAILED response"""
+    return _json_response(400, {"status": "FAILED", "comment": comment})
+
+
+class RecordingStore:
+    """Recorded Codeforces responses on disk"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _path(self, method: str, key: str) -> Path:
+        return self.directory / method / f"{key}.json"
+
+    def load(self, method: str, key: str) -> Optional[Any]:
+        """Load a recording, or None if there is none"""
+        path = self._path(method, key)
+        if not path.is_file():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, method: str, key: str, payload: Any) -> None:
+        """Save a recording"""
+        path = self._path(method, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+
+    # user.info results are stored per handle so any combination of handles can be replayed
+    def load_user(self, handle: str) -> Optional[Dict[str, Any]]:
+        return self.load("user.info", handle.lower())
+
+    def save_user(self, user: Dict[str, Any]) -> None:
+        self.save("user.info", user["handle"].lower(), user)
+
+
+class MockData:
+    """Codeforces API responses synthesized from app.data mock users and problems"""
+
+    def __init__(self):
+        self.users = {user["handle"].lower(): user for user in MOCK_USERS}
+
+    def user(self, handle: str) -> Optional[Dict[str, Any]]:
+        user = self.users.get(handle.lower())
+        if user is None:
+            return None
+        return {
+            "handle": user["handle"],
+            "rating": user["rating"],
+            "maxRating": user["maxRating"],
+            "rank": user["rank"],
+            "maxRank": user["maxRank"],
+            "titlePhoto": user["avatar"],
+            "contribution": user["contribution"],
+            "friendOfCount": user["friendOfCount"],
+        }
+
+    def rating_history(self, handle: str) -> Optional[list]:
+        user = self.users.get(handle.lower())
+        if user is None:
+            return None
+        history = sorted(user.get("contest_history", []), key=lambda c: c["ratingUpdateTimeSeconds"])
+        return [{**change, "handle": user["handle"]} for change in history]
+
+    @staticmethod
+    def _problem(problem: Dict[str, Any]) -> Dict[str, Any]:
+        """Codeforces problem object of a mock problem"""
+        match = MOCK_PROBLEM_ID_RE.match(problem["id"])
+        contest_id, index = (int(match.group(1)), match.group(2)) if match else (None, problem["id"])
+        return {
+            "contestId": contest_id,
+            "index": index,
+            "name": problem["name"],
+            "type": "PROGRAMMING",
+            "rating": problem["rating"],
+            "tags": problem["tags"],
+        }
+
+    def problemset(self) -> Dict[str, Any]:
+        problems = [self._problem(problem) for problem in MOCK_PROBLEMS]
+        statistics = [
+            {"contestId": cf_problem["contestId"], "index": cf_problem["index"], "solvedCount": problem["solved_count"]}
+            for cf_problem, problem in zip(problems, MOCK_PROBLEMS)
+        ]
+        return {"problems": problems, "problemStatistics": statistics}
+
+    def submissions(self, handle: str) -> Optional[list]:
+        """
+        Deterministic submission history: the user tries about half of the
+        problems and gets each accepted with the Elo odds of their rating
+        against the problem's.
+        """
+        user = self.users.get(handle.lower())
+        if user is None:
+            return None
+        rng = random.Random(user["handle"])
+        result = []
+        for problem in MOCK_PROBLEMS:
+            if rng.random() >= 0.5:
+                continue
+            solve_odds = 1 / (1 + 10 ** ((problem["rating"] - user["rating"]) / 400))
+            result.append({
+                "id": len(result) + 1,
+                "contestId": self._problem(problem)["contestId"],
+                "creationTimeSeconds": 1700000000 + len(result) * 3600,
+                "problem": self._problem(problem),
+                "programmingLanguage": "C++17 (GCC 7-32)",
+                "verdict": "OK" if rng.random() < solve_odds else "WRONG_ANSWER",
+            })
+        return list(reversed(result))
+
+    def contests(self) -> list:
+        contests: Dict[int, Dict[str, Any]] = {}
+        for user in MOCK_USERS:
+            for change in user.get("contest_history", []):
+                contests.setdefault(change["contestId"], {
+                    "id": change["contestId"],
+                    "name": change["contestName"],
+                    "type": "CF",
+                    "phase": "FINISHED",
+                    "frozen": False,
+                    "durationSeconds": 7200,
+                    "startTimeSeconds": change["ratingUpdateTimeSeconds"] - 4 * 3600,
+                })
+        return sorted(contests.values(), key=lambda c: c["startTimeSeconds"], reverse=True)
+
+    def rating_changes(self, contest_id: int) -> list:
+        rows = defaultdict(list)
+        for user in MOCK_USERS:
+            for change in user.get("contest_history", []):
+                rows[change["contestId"]].append({**change, "handle": user["handle"]})
+        return sorted(rows.get(contest_id, []), key=lambda c: c["rank"])
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport that serves recorded Codeforces responses without network access"""
+
+    def __init__(
+        self,
+        recordings_dir: Optional[str] = None,
+        latency_ms: float = 0,
+        latency_jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        use_mock_data: bool = True,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize replay transport.
+
+        Args:
+            recordings_dir: Directory written by RecordingTransport (optional)
+            latency_ms: Base latency added to every response
+            latency_jitter_ms: Extra uniformly distributed latency on top of the base
+            error_rate: Fraction of requests answered with 503 (0.0 - 1.0)
+            use_mock_data: Answer from app.data mock data when no recording exists
+            seed: Random seed for reproducible latency and error patterns
+        """
+        self.store = RecordingStore(recordings_dir) if recordings_dir else None
+        self.mock = MockData() if use_mock_data else None
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency_ms + self.random.uniform(0, self.latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        if self.random.random() < self.error_rate:
+            return httpx.Response(503, content=b"Service Temporarily Unavailable")
+
+        method = _method_name(request)
+        params = dict(request.url.params)
+
+        if method == "user.info":
+            return self._user_info(params.get("handles", ""))
+
+        payload = self.store.load(method, _recording_key(params)) if self.store else None
+        if payload is not None:
+            return _json_response(200, payload)
+
+        result = self._mock_result(method, params)
+        if result is not None:
+            return _json_response(200, {"status": "OK", "result": result})
+        if method in ("user.rating", "user.status"):
+            return _failed(f"handle: User with handle {params.get('handle')} not found")
+        return _failed(f"No recording for {method}?{urlencode(params)}")
+
+    def _user_info(self, handles: str) -> httpx.Response:
+        """Assemble a multi-handle user.info response from per-handle recordings"""
+        users = []
+        for handle in filter(None, handles.split(";")):
+            user = self.store.load_user(handle) if self.store else None
+            if user is None and self.mock:
+                user = self.mock.user(handle)
+            if user is None:
+                return _failed(f"handles: User with handle {handle} not found")
+            users.append(user)
+        return _json_response(200, {"status": "OK", "result": users})
+
+    def _mock_result(self, method: str, params: Dict[str, str]) -> Optional[Any]:
+        """Result synthesized from mock data, or None"""
+        if self.mock is None:
+            return None
+        if method == "user.rating":
+            return self.mock.rating_history(params.get("handle", ""))
+        if method == "user.status":
+            return self.mock.submissions(params.get("handle", ""))
+        if method == "problemset.problems":
+            return self.mock.problemset()
+        if method == "contest.list":
+            return self.mock.contests()
+        if method == "contest.ratingChanges" and params.get("contestId", "").isdigit():
+            return self.mock.rating_changes(int(params["contestId"]))
+        return None
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that passes requests through and records successful responses"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, recordings_dir: str):
+        """
+        Initialize recording transport.
+
+        Args:
+            transport: Transport doing the real requests
+            recordings_dir: Directory to write recordings to
+        """
+        self.transport = transport
+        self.store = RecordingStore(recordings_dir)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        if response.status_code != 200:
+            return response
+
+        body = await response.aread()
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return httpx.Response(response.status_code, headers=response.headers, content=body)
+
+        if payload.get("status") == "OK":
+            method = _method_name(request)
+            try:
+                if method == "user.info":
+                    for user in payload.get("result", []):
+                        self.store.save_user(user)
+                else:
+                    self.store.save(method, _recording_key(dict(request.url.params)), payload)
+            except OSError as e:
+                logger.warning(f"Could not record {method}: {e}")
+
+        return httpx.Response(response.status_code, headers=response.headers, content=body)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def create_standin_app(transport: ReplayTransport):
+    """ASGI app serving the replay transport at /api/{method}, like codeforces.com"""
+    from fastapi import FastAPI, Request, Response
+
+    standin = FastAPI(title="Codeforces API stand-in")
+
+    @standin.get("/api/{method}")
+    async def call_method(method: str, request: Request):
+        replayed = await transport.handle_async_request(
+            httpx.Request("GET", f"http://standin/api/{method}", params=request.query_params.multi_items())
+        )
+        return Response(
+            content=await replayed.aread(),
+            status_code=replayed.status_code,
+            media_type=replayed.headers.get("Content-Type")
+        )
+
+    return standin
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve recorded Codeforces API responses locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--recordings-dir", default=None)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_standin_app(ReplayTransport(
+            recordings_dir=args.recordings_dir,
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.latency_jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed
+        )),
+        host=args.host,
+        port=args.port
+    )
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.services.codeforces_client import get_cf_client
+from app.utils.rate_limiter import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardService:
+    """Keeps a precomputed leaderboard snapshot refreshed in the background"""
+
+    def __init__(self, handles: List[str], refresh_interval: float = 300):
+        """
+        Initialize leaderboard service.
+
+        Args:
+            handles: Codeforces handles to rank
+            refresh_interval: Seconds between background refreshes
+        """
+        self.handles = handles
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Latest ready-to-serve snapshot, or None before the first refresh"""
+        return self._snapshot
+
+    async def get_leaderboard(self) -> Dict[str, Any]:
+        """Return the current snapshot, building it first if none exists yet"""
+        if self._snapshot is None:
+            await self.refresh()
+        return self._snapshot
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Rebuild the snapshot; concurrent callers share one rebuild"""
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.ensure_future(self._build())
+        return await asyncio.shield(self._refreshing)
+
+    async def _build(self) -> Dict[str, Any]:
+        """Fetch all handles concurrently (batched by the client) and rank them"""
+        cf_client = get_cf_client()
+        users = await cf_client.get_users_info(self.handles)
+        users_list = [user for user in users.values() if user]
+
+        if not users_list and self._snapshot and self._snapshot["users"]:
+            logger.warning("Leaderboard refresh returned no users, keeping previous snapshot")
+            return self._snapshot
+
+        # Sort by rating
+        users_list.sort(key=lambda x: x.get("rating", 0), reverse=True)
+
+        self._snapshot = {
+            "users": users_list,
+            "count": len(users_list),
+            "refreshed_at": datetime.now(timezone.utc).isoformat()
+        }
+        return self._snapshot
+
+    def start(self) -> None:
+        """Start the background refresh loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        """Refresh forever at background priority, logging (not raising) failures"""
+        while True:
+            try:
+                # Queue behind interactive requests for the upstream budget
+                with request_priority(Priority.BACKGROUND):
+                    await self.refresh()
+            except Exception as e:
+                logger.error(f"Leaderboard refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+# Singleton instance
+_leaderboard_service: Optional[LeaderboardService] = None
+
+def get_leaderboard_service() -> LeaderboardService:
+    """Get or create leaderboard service singleton"""
+    global _leaderboard_service
+    if _leaderboard_service is None:
+        _leaderboard_service = LeaderboardService(
+            handles=settings.leaderboard_handles_list,
+            refresh_interval=settings.leaderboard_refresh_seconds
+        )
+    return _leaderboard_service
@@ -0,0 +1,561 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import orjson
+from app.config import settings
+from app.data.mock_problems import MOCK_PROBLEMS
+from app.services.codeforces_client import CodeforcesUnavailableError, get_cf_client
+from app.utils.deadline import DeadlineExceeded, within_deadline
+from app.utils.ngram import NGramIndex
+from app.utils.singleflight import SingleFlight
+from app.utils.tag_query import evaluate_tag_query, parse_tag_query
+
+logger = logging.getLogger(__name__)
+
+# Problem ids are a contest id followed by the problem index, e.g. "1900B" or "1881F2"
+PROBLEM_ID_RE = re.compile(r"^(\d+)([A-Za-z]\d*)$")
+# Separators people put between contest id and index ("1900-B", "1900/B")
+PROBLEM_ID_SEPARATORS_RE = re.compile(r"[\s/_-]+")
+
+# Orderings precomputed per index version; any other sort_by keeps catalogue order
+SORT_KEYS = ("rating", "solved_count", "contest_id")
+CATALOGUE_ORDER = "catalogue"
+# Search score order, computed per query (falls back to catalogue order without a search)
+RELEVANCE_ORDER = "relevance"
+
+# Rating histogram buckets of the facet counts (Codeforces ratings are multiples of 100)
+RATING_BUCKET_MIN = 800
+RATING_BUCKET_MAX = 3500
+RATING_BUCKET_STEP = 100
+
+# Rows examined per step when walking an ordering for the next page (doubles while matches are sparse)
+PAGE_SCAN_CHUNK = 512
+
+
+class CursorError(ValueError):
+    """Raised for a malformed or mismatched pagination cursor"""
+
+
+def catalogue_version(problems: List[Dict[str, Any]], contest_names: Optional[Dict[int, str]] = None) -> str:
+    """
+    Version of a catalogue derived from its content.
+
+    Every worker process building from the same problemset gets the same
+    version, so cursors and cache keys carrying it are valid across workers.
+    """
+    digest = hashlib.sha256(orjson.dumps(problems))
+    digest.update(orjson.dumps(sorted((contest_names or {}).items())))
+    return digest.hexdigest()[:16]
+
+
+def query_digest(**filters: Any) -> str:
+    """Short hash of the filters a page was produced with, bound into its cursor"""
+    return hashlib.sha256(orjson.dumps(filters, option=orjson.OPT_SORT_KEYS)).hexdigest()[:12]
+
+
+def normalize_problem_id(problem_id: str) -> str:
+    """Canonical form of a problem id: "1900b", "1900-B" and "1900 / b" all become 1900B"""
+    return PROBLEM_ID_SEPARATORS_RE.sub("", problem_id).upper()
+
+
+def split_problem_id(problem_id: str) -> Tuple[Optional[int], str]:
+    """Split a problem id into contest id and index ("1900B" -> (1900, "B"))"""
+    match = PROBLEM_ID_RE.match(problem_id.strip())
+    if not match:
+        return None, problem_id.strip()
+    return int(match.group(1)), match.group(2).upper()
+
+
+class ProblemIndex:
+    """
+    Column-oriented, read-only view of the problem catalogue.
+
+    Numeric fields live in NumPy arrays and tags in a boolean matrix
+    (one row per problem, one column per tag), so filters are evaluated as
+    vectorized masks instead of per-problem Python loops. Tags are also
+    indexed as packed bitmaps (tag -> set of rows) for boolean tag queries.
+    Each sort key has a precomputed permutation of the rows, so a page is
+    produced by walking that permutation from a cursor position rather
+    than sorting the matches. Problems are addressed by their row number in
+    `problems`.
+    """
+
+    def __init__(
+        self,
+        problems: List[Dict[str, Any]],
+        version: str = "",
+        contest_names: Optional[Dict[int, str]] = None,
+        fuzzy_threshold: float = 0.5
+    ):
+        """
+        Build the index.
+
+        Args:
+            problems: Problem dicts (id, name, rating, tags, solved_count and,
+                for Codeforces data, contestId and index)
+            version: Catalogue version this index was built from (see catalogue_version)
+            contest_names: Contest names by id, made searchable alongside problem names
+            fuzzy_threshold: Fraction of query trigrams a problem must share
+                to match a search that nothing contains exactly
+        """
+        self.problems = problems
+        self.version = version
+        self.fuzzy_threshold = fuzzy_threshold
+        size = len(problems)
+
+        # Hash index by canonical id (contestId + index)
+        self.by_id: Dict[str, int] = {}
+        canonical_ids = []
+        for row, problem in enumerate(problems):
+            if problem.get("contestId") is not None and problem.get("index"):
+                key = normalize_problem_id(f"{problem['contestId']}{problem['index']}")
+            else:
+                key = normalize_problem_id(problem["id"])
+            self.by_id.setdefault(key, row)
+            canonical_ids.append(key)
+        self.canonical_ids = np.array(canonical_ids, dtype=str)
+
+        # Unrated problems get rating 0 and never match a rating bound
+        self.rating = np.fromiter((p.get("rating") or 0 for p in problems), dtype=np.int32, count=size)
+        self.solved_count = np.fromiter((p.get("solved_count") or 0 for p in problems), dtype=np.int64, count=size)
+        self.contest_id = np.fromiter(
+            (p.get("contestId") or split_problem_id(p["id"])[0] or 0 for p in problems),
+            dtype=np.int32,
+            count=size
+        )
+
+        self.tag_names: List[str] = sorted({tag for p in problems for tag in p.get("tags", [])})
+        self.tag_ids: Dict[str, int] = {tag: i for i, tag in enumerate(self.tag_names)}
+        self.tags = np.zeros((size, len(self.tag_names)), dtype=bool)
+        for row, problem in enumerate(problems):
+            self.tags[row, [self.tag_ids[tag] for tag in problem.get("tags", [])]] = True
+        # Float copy and totals for scoring with matrix products (recommendations)
+        self.tag_matrix = self.tags.astype(np.float32)
+        self.tag_totals = self.tags.sum(axis=0)
+        self.tag_counts = self.tags.sum(axis=1)
+
+        # Inverted index: one bit per problem, 8 problems per byte
+        self.universe = np.packbits(np.ones(size, dtype=bool))
+        self._empty = np.zeros_like(self.universe)
+        self.tag_bitmaps: Dict[str, np.ndarray] = {}
+        for tag, column in self.tag_ids.items():
+            bitmap = np.packbits(self.tags[:, column])
+            key = tag.lower()
+            self.tag_bitmaps[key] = bitmap | self.tag_bitmaps[key] if key in self.tag_bitmaps else bitmap
+
+        # Ascending sort keys (negated for descending orders) and the row permutation for each.
+        # Ties are ordered by problem id, so (key, id) is a keyset that survives reloads
+        sort_keys = {
+            "rating": self.rating.astype(np.int64),
+            "solved_count": -self.solved_count,
+            "contest_id": -self.contest_id.astype(np.int64),
+            CATALOGUE_ORDER: np.arange(size, dtype=np.int64),
+        }
+        self._orderings: Dict[str, np.ndarray] = {}
+        self._sorted_keys: Dict[str, np.ndarray] = {}
+        self._sorted_ids: Dict[str, np.ndarray] = {}
+        for key, values in sort_keys.items():
+            ordering = np.lexsort((self.canonical_ids, values)) if key in SORT_KEYS else np.arange(size)
+            self._orderings[key] = ordering
+            self._sorted_keys[key] = values[ordering]
+            self._sorted_ids[key] = self.canonical_ids[ordering]
+
+        contest_names = contest_names or {}
+        self.text_index = NGramIndex([
+            [p["id"], p.get("name") or "", contest_names.get(int(contest_id), "")]
+            for p, contest_id in zip(problems, self.contest_id)
+        ])
+
+    def __len__(self) -> int:
+        return len(self.problems)
+
+    def mask(
+        self,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        tags: Optional[List[str]] = None,
+        tag_query: Optional[str] = None,
+        min_solved: Optional[int] = None,
+        search: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Boolean mask of the problems matching every given predicate.
+
+        Args:
+            min_rating: Minimum rating (inclusive)
+            max_rating: Maximum rating (inclusive)
+            tags: Problems having any of these tags; unknown tags match nothing
+            tag_query: Boolean tag expression, e.g. "dp AND NOT implementation"
+            min_solved: Minimum solve count (inclusive)
+            search: Case-insensitive substring of the problem id, name or contest
+                name; when nothing contains it, problems with similar text (typos)
+
+        Raises:
+            TagQueryError: tag_query is malformed
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if min_rating is not None:
+            mask &= self.rating >= min_rating
+        if max_rating is not None:
+            mask &= (self.rating <= max_rating) & (self.rating > 0)
+        if min_solved is not None:
+            mask &= self.solved_count >= min_solved
+
+        if tags:
+            mask &= self.unpack(self.tags_bitmap(tags))
+        if tag_query:
+            mask &= self.unpack(self.tag_query_bitmap(tag_query))
+
+        if search:
+            matches = np.zeros(len(self), dtype=bool)
+            matches[self.text_index.search(search, self.fuzzy_threshold)[0]] = True
+            mask &= matches
+
+        return mask
+
+    def facets(self, mask: np.ndarray) -> Dict[str, Any]:
+        """
+        Facet counts of the problems selected by a mask.
+
+        Tag counts are one matrix-vector product over the tag matrix and the
+        rating histogram one bincount, so facets cost about as much as the
+        filter itself.
+
+        Returns:
+            Dictionary with tags (non-zero counts, most frequent first),
+            ratings (every bucket from RATING_BUCKET_MIN to RATING_BUCKET_MAX)
+            and the number of unrated problems
+        """
+        tag_counts = mask.astype(np.float32) @ self.tag_matrix
+        present = np.flatnonzero(tag_counts)
+        present = present[np.argsort(-tag_counts[present], kind="stable")]
+
+        ratings = self.rating[mask]
+        rated = ratings[ratings > 0]
+        buckets = (np.clip(rated, RATING_BUCKET_MIN, RATING_BUCKET_MAX) - RATING_BUCKET_MIN) // RATING_BUCKET_STEP
+        histogram = np.bincount(buckets, minlength=(RATING_BUCKET_MAX - RATING_BUCKET_MIN) // RATING_BUCKET_STEP + 1)
+
+        return {
+            "tags": [{"tag": self.tag_names[tag], "count": int(tag_counts[tag])} for tag in present.tolist()],
+            "ratings": [
+                {"rating": RATING_BUCKET_MIN + bucket * RATING_BUCKET_STEP, "count": count}
+                for bucket, count in enumerate(histogram.tolist())
+            ],
+            "unrated": len(ratings) - len(rated),
+        }
+
+    def tag_bitmap(self, tag: str) -> np.ndarray:
+        """Packed bitmap of the problems having a tag (empty for unknown tags)"""
+        return self.tag_bitmaps.get(tag.lower(), self._empty)
+
+    def tags_bitmap(self, tags: List[str]) -> np.ndarray:
+        """Packed bitmap of the problems having any of the tags"""
+        result = self._empty.copy()
+        for tag in tags:
+            np.bitwise_or(result, self.tag_bitmap(tag), out=result)
+        return result
+
+    def tag_query_bitmap(self, query: str) -> np.ndarray:
+        """
+        Packed bitmap of the problems matching a boolean tag expression.
+
+        Raises:
+            TagQueryError: The expression is malformed
+        """
+        return evaluate_tag_query(parse_tag_query(query), self.tag_bitmap, self.universe)
+
+    def ids_bitmap(self, problem_ids: List[str]) -> np.ndarray:
+        """Packed bitmap of the problems with the given ids (unknown ids are ignored)"""
+        selected = np.zeros(len(self), dtype=bool)
+        selected[self.lookup(problem_ids)[0]] = True
+        return np.packbits(selected)
+
+    def unpack(self, bitmap: np.ndarray) -> np.ndarray:
+        """Boolean row mask of a packed bitmap"""
+        return np.unpackbits(bitmap, count=len(self)).view(bool)
+
+    @staticmethod
+    def sort_key(sort_by: Optional[str]) -> str:
+        """Normalize a sort_by value to one of the precomputed orderings (or relevance)"""
+        return sort_by if sort_by in SORT_KEYS or sort_by == RELEVANCE_ORDER else CATALOGUE_ORDER
+
+    def search(self, query: str, limit: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Problems matching a search, most relevant first.
+
+        Ties in relevance go to the more solved (more popular) problem. With
+        a limit only the best matches are selected (partial sort).
+
+        Returns:
+            (rows, relevance scores)
+        """
+        rows, scores = self.text_index.search(query, self.fuzzy_threshold)
+        # Relevance dominates; solve counts stay far below the smallest score difference
+        rank = scores * 1e12 + self.solved_count[rows]
+        if limit is not None and len(rows) > limit:
+            best = np.argpartition(-rank, limit)[:limit]
+            rows, scores, rank = rows[best], scores[best], rank[best]
+        order = np.argsort(-rank, kind="stable")
+        return rows[order], scores[order]
+
+    def ordering(self, sort_by: Optional[str], search: Optional[str] = None) -> np.ndarray:
+        """Row permutation for a sort key; relevance needs the search it ranks"""
+        key = self.sort_key(sort_by)
+        if key == RELEVANCE_ORDER:
+            return self.search(search)[0] if search else self._orderings[CATALOGUE_ORDER]
+        return self._orderings[key]
+
+    def page(
+        self,
+        mask: np.ndarray,
+        sort_by: Optional[str],
+        start: int,
+        limit: int,
+        search: Optional[str] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Next matching rows in sort order, starting at a position in the ordering.
+
+        Rating sorts ascending, solved_count and contest_id descending,
+        relevance by search score, other keys keep catalogue order. Only as
+        much of the ordering is examined as it takes to fill the page.
+
+        Args:
+            mask: Boolean mask of matching rows
+            sort_by: Sort key
+            start: Position in the ordering to resume from (0 for the first page)
+            limit: Page size
+            search: Search query, for the relevance order
+
+        Returns:
+            (rows, position after the last returned row, or -1 once the ordering is exhausted)
+        """
+        ordering = self.ordering(sort_by, search)
+        found: List[np.ndarray] = []
+        needed = limit
+        position = start
+        chunk = max(PAGE_SCAN_CHUNK, limit)
+        while needed > 0 and position < len(ordering):
+            window = ordering[position:position + chunk]
+            hits = np.flatnonzero(mask[window])[:needed]
+            found.append(window[hits])
+            needed -= len(hits)
+            position = position + int(hits[-1]) + 1 if needed == 0 else position + len(window)
+            chunk *= 2
+
+        rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+        # A full page may be followed by an empty one; finding out would mean scanning the rest
+        if needed > 0 or position >= len(ordering):
+            position = -1
+        return rows, position
+
+    def position_of(self, sort_by: Optional[str], nth: int, mask: np.ndarray, search: Optional[str] = None) -> int:
+        """Position in the ordering of the nth (0-based) matching row, for offset pagination"""
+        ordering = self.ordering(sort_by, search)
+        matches = np.flatnonzero(mask[ordering])
+        return int(matches[nth]) if nth < len(matches) else len(ordering)
+
+    def encode_cursor(self, sort_by: Optional[str], position: int, query: str = "") -> str:
+        """
+        Opaque cursor for resuming at a position of an ordering.
+
+        It carries the index version and the query digest (see query_digest)
+        plus the sort key value and problem id of the row just before the
+        position, so for the precomputed sort keys it stays usable (as a
+        keyset) after the catalogue reloads.
+        """
+        key = self.sort_key(sort_by)
+        last_key = last_id = None
+        if position > 0 and key in SORT_KEYS:
+            last_key = int(self._sorted_keys[key][position - 1])
+            last_id = str(self._sorted_ids[key][position - 1])
+        raw = orjson.dumps([self.version, key, query, position, last_key, last_id])
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    def decode_cursor(self, cursor: str, sort_by: Optional[str], query: str = "") -> int:
+        """
+        Position in the ordering a cursor resumes from.
+
+        Raises:
+            CursorError: The cursor is malformed, was issued for another sort
+                order or other filters, or can no longer be resumed because
+                the catalogue changed
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            version, key, cursor_query, position, last_key, last_id = orjson.loads(raw)
+        except (binascii.Error, orjson.JSONDecodeError, ValueError, TypeError):
+            raise CursorError("Malformed cursor")
+
+        if key != self.sort_key(sort_by):
+            raise CursorError(f"Cursor was issued for sort_by={key}")
+        if cursor_query != query:
+            raise CursorError("Cursor was issued for different filters")
+        if type(position) is not int or position < 0:
+            raise CursorError("Malformed cursor")
+        if version == self.version:
+            if position > len(self):
+                raise CursorError("Malformed cursor")
+            return position
+        if position == 0:
+            return 0
+        # Relevance and catalogue order have no stable key to resume from
+        if key not in SORT_KEYS:
+            raise CursorError("The catalogue changed since this cursor was issued; start from the first page")
+        if type(last_key) is not int or not -2 ** 62 < last_key < 2 ** 62 or not isinstance(last_id, str):
+            raise CursorError("Malformed cursor")
+
+        # Catalogue changed: resume after the last (key, id) seen (keyset pagination)
+        sorted_keys = self._sorted_keys[key]
+        lo = int(np.searchsorted(sorted_keys, last_key, side="left"))
+        hi = int(np.searchsorted(sorted_keys, last_key, side="right"))
+        return lo + int(np.searchsorted(self._sorted_ids[key][lo:hi], last_id, side="right"))
+
+    def get(self, problem_id: str) -> Optional[Dict[str, Any]]:
+        """Problem by id (any casing or separator, e.g. "1900b" or "1900-B"), or None"""
+        row = self.by_id.get(normalize_problem_id(problem_id))
+        return self.problems[row] if row is not None else None
+
+    def lookup(self, problem_ids: List[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Rows of many problems by id, in request order with duplicates dropped.
+
+        Returns:
+            (rows, ids that matched no problem)
+        """
+        rows: Dict[int, None] = {}
+        missing = []
+        for problem_id in problem_ids:
+            row = self.by_id.get(normalize_problem_id(problem_id))
+            if row is None:
+                missing.append(problem_id)
+            else:
+                rows[row] = None
+        return np.fromiter(rows, dtype=np.int64, count=len(rows)), missing
+
+    def autocomplete(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best matches for a partially typed query as short suggestions"""
+        rows, _ = self.search(query, limit)
+        return [
+            {"id": problem["id"], "name": problem.get("name"), "rating": problem.get("rating")}
+            for problem in self.rows(rows[:limit])
+        ]
+
+    def rows(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Problem dicts for the given row numbers"""
+        return [self.problems[row] for row in rows.tolist()]
+
+
+class ProblemCatalog:
+    """
+    Holds the current ProblemIndex and rebuilds it when the catalogue changes.
+
+    With source "codeforces" the index follows the client's cached
+    problemset: whenever the cache hands back a new problem list (after a
+    refresh), a new index is built. Its version is derived from the data,
+    so all workers agree on it. Indexes are immutable, so requests holding the previous one are unaffected.
+    """
+
+    def __init__(self, source: str = "mock", fuzzy_threshold: float = 0.5):
+        """
+        Initialize catalog.
+
+        Args:
+            source: "mock" (app.data problems) or "codeforces" (the live problemset)
+            fuzzy_threshold: Passed to each ProblemIndex for typo-tolerant search
+        """
+        if source not in ("mock", "codeforces"):
+            raise ValueError(f"Unknown problem catalog source {source!r}")
+        self.source = source
+        self.fuzzy_threshold = fuzzy_threshold
+        self._index: Optional[ProblemIndex] = None
+        self._loaded_from: Optional[List[Dict[str, Any]]] = None
+        self._latest: Optional[List[Dict[str, Any]]] = None
+        self._builds = SingleFlight()
+
+    @property
+    def version(self) -> Optional[str]:
+        """Version of the current index (None before the first build)"""
+        return self._index.version if self._index is not None else None
+
+    async def get_index(self) -> ProblemIndex:
+        """
+        Get the current index, (re)building it if the catalogue changed.
+
+        Raises:
+            CodeforcesUnavailableError: The problemset cannot be loaded and no index exists yet
+        """
+        if self.source == "mock":
+            if self._index is None:
+                self.reload(MOCK_PROBLEMS)
+            return self._index
+
+        try:
+            problems = await get_cf_client().get_problemset()
+        except (CodeforcesUnavailableError, DeadlineExceeded) as e:
+            if self._index is None:
+                raise
+            logger.warning(f"Serving problem index v{self.version}, problemset unavailable: {e}")
+            return self._index
+
+        # The client returns the same list object until its cache entry is replaced,
+        # so concurrent requests after a refresh share one build of the new list
+        self._latest = problems
+        if problems is not self._loaded_from:
+            await within_deadline(self._builds.do(id(problems), lambda: self._build_and_install(problems)))
+        return self._index
+
+    async def _build_and_install(self, problems: List[Dict[str, Any]]) -> None:
+        contest_names = await self._contest_names()
+        # Building takes a few hundred ms for the full problemset; keep the event loop free
+        index = await asyncio.to_thread(self._build, problems, contest_names)
+        # A newer problemset may have arrived meanwhile; never replace its index with an older one
+        if problems is self._latest or self._index is None:
+            self._install(index, problems)
+
+    async def _contest_names(self) -> Dict[int, str]:
+        """Contest names by id for search; empty if the contest list is unavailable"""
+        try:
+            contests = await get_cf_client().get_contest_list()
+        except (CodeforcesUnavailableError, DeadlineExceeded) as e:
+            logger.warning(f"Indexing problems without contest names: {e}")
+            return {}
+        return {contest["id"]: contest["name"] for contest in contests if contest.get("id") is not None}
+
+    def reload(self, problems: List[Dict[str, Any]], contest_names: Optional[Dict[int, str]] = None) -> ProblemIndex:
+        """Build a new index from problems and make it current"""
+        return self._install(self._build(problems, contest_names), problems)
+
+    def _build(self, problems: List[Dict[str, Any]], contest_names: Optional[Dict[int, str]]) -> ProblemIndex:
+        return ProblemIndex(
+            problems,
+            version=catalogue_version(problems, contest_names),
+            contest_names=contest_names,
+            fuzzy_threshold=self.fuzzy_threshold
+        )
+
+    def _install(self, index: ProblemIndex, problems: List[Dict[str, Any]]) -> ProblemIndex:
+        self._index = index
+        self._loaded_from = problems
+        logger.info(f"Problem index v{index.version} built with {len(problems)} problems")
+        return self._index
+
+
+# Singleton instance
+_problem_catalog: Optional[ProblemCatalog] = None
+
+def get_problem_catalog() -> ProblemCatalog:
+    """Get or create problem catalog singleton"""
+    global _problem_catalog
+    if _problem_catalog is None:
+        _problem_catalog = ProblemCatalog(
+            source=settings.problem_catalog_source,
+            fuzzy_threshold=settings.problem_search_fuzzy_threshold
+        )
+    return _problem_catalog
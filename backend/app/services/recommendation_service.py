@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.services.problem_catalog import ProblemIndex
+from app.services.solved_service import SolvedSets
+
+# Weights of the score components (each component lies in [0, 1])
+DIFFICULTY_WEIGHT = 0.5
+WEAKNESS_WEIGHT = 0.25
+POPULARITY_WEIGHT = 0.15
+ATTEMPTED_WEIGHT = 0.1
+
+# Rating assumed for users without rated contests
+BASELINE_RATING = 800
+
+# Weak tags reported with the recommendations
+WEAK_TAGS_SHOWN = 5
+
+
+class RecommendationService:
+    """
+    Picks problems to practice next by scoring the whole catalogue against a user profile.
+
+    Every problem gets a score from four components computed as whole-array
+    operations over the ProblemIndex columns:
+
+    - difficulty: Gaussian around the target rating (current rating plus an offset)
+    - weakness: mean weakness of the problem's tags, where a tag is weak when
+      the user's submissions in it often fail or it is under-represented
+      among their solves
+    - popularity: log solve count, so well-trodden problems come first
+    - attempted: problems tried but never solved get a bonus
+
+    Solved and unrated problems are excluded, and the top k come from a
+    partial sort (argpartition), so a request costs a few passes over the
+    columns regardless of catalogue size.
+    """
+
+    def __init__(self, rating_offset: int = 100, rating_spread: int = 200):
+        """
+        Initialize recommendation service.
+
+        Args:
+            rating_offset: Target difficulty relative to the current rating
+            rating_spread: Rating distance at which the difficulty score drops to ~0.6
+        """
+        self.rating_offset = rating_offset
+        self.rating_spread = rating_spread
+
+    @staticmethod
+    def current_rating(rating_history: List[Dict[str, Any]], user: Optional[Dict[str, Any]] = None) -> int:
+        """Rating after the last rated contest (or from user info), at least BASELINE_RATING"""
+        if rating_history:
+            rating = rating_history[-1].get("newRating") or 0
+        else:
+            rating = (user or {}).get("rating") or 0
+        return max(rating, BASELINE_RATING)
+
+    @staticmethod
+    def tag_weakness(index: ProblemIndex, solved: np.ndarray, attempted: np.ndarray) -> np.ndarray:
+        """
+        Weakness of each tag in [0, 1].
+
+        Half is the smoothed failure rate in the tag, (attempted + 1) /
+        (solved + attempted + 2); half is how far the tag's share of the
+        user's solves falls short of its share of the catalogue.
+
+        Args:
+            index: Problem index
+            solved: Boolean row mask of solved problems
+            attempted: Boolean row mask of problems tried but never solved
+        """
+        solved_per_tag = solved.astype(np.float32) @ index.tag_matrix
+        attempted_per_tag = attempted.astype(np.float32) @ index.tag_matrix
+        failure_rate = (attempted_per_tag + 1) / (solved_per_tag + attempted_per_tag + 2)
+
+        solved_share = solved_per_tag / max(int(np.count_nonzero(solved)), 1)
+        catalogue_share = index.tag_totals / max(len(index), 1)
+        shortfall = np.clip(1 - solved_share / np.maximum(catalogue_share, 1e-9), 0, 1)
+        return 0.5 * failure_rate + 0.5 * shortfall
+
+    def scores(
+        self,
+        index: ProblemIndex,
+        rating: int,
+        solved: np.ndarray,
+        attempted: np.ndarray,
+        tag_weakness: np.ndarray
+    ) -> np.ndarray:
+        """
+        Score every problem for a user (-inf for excluded problems).
+
+        Args:
+            index: Problem index
+            rating: User's current rating
+            solved: Boolean row mask of solved problems
+            attempted: Boolean row mask of problems tried but never solved
+            tag_weakness: Per-tag weakness from tag_weakness()
+        """
+        target = rating + self.rating_offset
+        difficulty = np.exp(-0.5 * ((index.rating - target) / self.rating_spread) ** 2)
+
+        weakness = (index.tag_matrix @ tag_weakness) / np.maximum(index.tag_counts, 1)
+
+        popularity = np.log1p(index.solved_count)
+        popularity /= max(float(popularity.max(initial=0)), 1.0)
+
+        scores = (
+            DIFFICULTY_WEIGHT * difficulty
+            + WEAKNESS_WEIGHT * weakness
+            + POPULARITY_WEIGHT * popularity
+            + ATTEMPTED_WEIGHT * attempted
+        )
+        scores[solved | (index.rating == 0)] = -np.inf
+        return scores
+
+    def recommend(self, index: ProblemIndex, rating: int, solved_sets: SolvedSets, limit: int = 10) -> Dict[str, Any]:
+        """
+        Top problems to practice next.
+
+        Args:
+            index: Problem index the solved sets are aligned to
+            rating: User's current rating
+            solved_sets: User's solved and attempted bitsets
+            limit: Number of problems to return
+
+        Returns:
+            Dictionary with the target rating, the weakest tags and the
+            recommended problems (best first, each with its score)
+        """
+        solved = index.unpack(solved_sets.solved)
+        attempted = index.unpack(solved_sets.attempted)
+        tag_weakness = self.tag_weakness(index, solved, attempted)
+        scores = self.scores(index, rating, solved, attempted, tag_weakness)
+
+        # Partial sort: only the top `limit` rows are ordered
+        limit = min(limit, int(np.count_nonzero(np.isfinite(scores))))
+        top = np.argpartition(-scores, limit - 1)[:limit] if limit else np.empty(0, dtype=np.int64)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        weak_tags = np.argsort(-tag_weakness, kind="stable")[:WEAK_TAGS_SHOWN]
+
+        return {
+            "rating": rating,
+            "target_rating": rating + self.rating_offset,
+            "weak_tags": [
+                {"tag": index.tag_names[tag], "weakness": round(float(tag_weakness[tag]), 3)}
+                for tag in weak_tags.tolist()
+            ],
+            "problems": [
+                {**index.problems[row], "score": round(float(scores[row]), 4), "attempted": bool(attempted[row])}
+                for row in top.tolist()
+            ],
+        }
+
+
+# Singleton instance
+_recommendation_service: Optional[RecommendationService] = None
+
+def get_recommendation_service() -> RecommendationService:
+    """Get or create recommendation service singleton"""
+    global _recommendation_service
+    if _recommendation_service is None:
+        _recommendation_service = RecommendationService(
+            rating_offset=settings.recommendation_rating_offset,
+            rating_spread=settings.recommendation_rating_spread
+        )
+    return _recommendation_service
@@ -0,0 +1,81 @@
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.services.codeforces_client import get_cf_client
+from app.services.problem_catalog import ProblemIndex
+from app.utils.cache import CacheNamespace
+
+
+@dataclass
+class SolvedSets:
+    """A user's solved and attempted problems as packed bitmaps aligned to one problem index"""
+    index_version: str
+    status: Dict[str, List[str]]  # the user.status summary the bitmaps were built from
+    solved: np.ndarray
+    attempted: np.ndarray  # tried but never accepted
+    generation: int  # unique per build, so response cache keys change with the bitmaps
+
+
+class SolvedService:
+    """Per-handle solved/attempted bitsets for joining the catalogue against a user's submissions"""
+
+    def __init__(self, ttl: float, max_bytes: int, policy: str = "lru"):
+        """
+        Initialize solved service.
+
+        Args:
+            ttl: Seconds a handle's bitsets are kept after being built
+            max_bytes: Memory budget of the bitsets
+            policy: Eviction policy within the budget ("lru" or "lfu")
+        """
+        self._sets = CacheNamespace("solved_sets", ttl=ttl, max_bytes=max_bytes, policy=policy)
+        self._generations = itertools.count(1)
+
+    async def get(self, handle: str, index: ProblemIndex) -> Optional[SolvedSets]:
+        """
+        Get a handle's bitsets aligned to index, rebuilding them only when the
+        user's submissions or the index changed.
+
+        Returns None when the handle does not exist.
+
+        Raises:
+            CodeforcesUnavailableError: Codeforces failed and nothing is cached
+        """
+        # The client returns the same summary object until its cache entry is replaced
+        status = await get_cf_client().get_user_problem_status(handle)
+        if status is None:
+            return None
+
+        key = handle.lower()
+        sets = self._sets.get(key)
+        if sets is None or sets.index_version != index.version or sets.status is not status:
+            sets = SolvedSets(
+                index_version=index.version,
+                status=status,
+                solved=index.ids_bitmap(status["solved"]),
+                attempted=index.ids_bitmap(status["attempted"]),
+                generation=next(self._generations)
+            )
+            self._sets.set(key, sets)
+        return sets
+
+    def stats(self) -> Dict[str, Any]:
+        """Bitset cache statistics"""
+        return self._sets.stats()
+
+
+# Singleton instance
+_solved_service: Optional[SolvedService] = None
+
+def get_solved_service() -> SolvedService:
+    """Get or create solved service singleton"""
+    global _solved_service
+    if _solved_service is None:
+        _solved_service = SolvedService(
+            ttl=settings.user_status_cache_ttl_seconds + settings.stale_grace_seconds,
+            max_bytes=settings.submissions_cache_max_bytes,
+            policy=settings.cache_eviction_policy
+        )
+    return _solved_service
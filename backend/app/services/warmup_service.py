@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+from app.config import settings
+from app.services.codeforces_client import get_cf_client
+from app.services.leaderboard_service import get_leaderboard_service
+from app.services.problem_catalog import get_problem_catalog
+from app.utils.rate_limiter import Priority, request_priority
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """Preloads hot handles and reference data into the caches after startup"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    TIMED_OUT = "timed_out"
+    DISABLED = "disabled"
+
+    def __init__(self, handles: List[str], timeout: float = 30.0, rating_history: bool = False, enabled: bool = True):
+        """
+        Initialize warmup service.
+
+        Args:
+            handles: Handles whose user info is preloaded
+            timeout: Seconds after which warmup gives up and the app reports ready anyway
+            rating_history: Also preload the rating histories of the handles
+            enabled: When False the app is ready immediately
+        """
+        self.handles = handles
+        self.timeout = timeout
+        self.rating_history = rating_history
+        self.state = self.PENDING if enabled else self.DISABLED
+        self.jobs: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether warmup has finished, timed out or is disabled"""
+        return self.state in (self.DONE, self.TIMED_OUT, self.DISABLED)
+
+    def status(self) -> Dict[str, Any]:
+        """Warmup state and the outcome of each job"""
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time.monotonic()) - self.started_at, 3)
+        return {"state": self.state, "elapsed_seconds": elapsed, "jobs": self.jobs}
+
+    def start(self) -> None:
+        """Start warming up in the background"""
+        if self.state != self.PENDING or self._task is not None:
+            return
+        # Lowest priority: live requests arriving meanwhile go first within the rate limit
+        with request_priority(Priority.WARMUP):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel warmup if it is still running"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _jobs(self) -> Dict[str, Awaitable[Any]]:
+        """Named loads to run concurrently"""
+        cf_client = get_cf_client()
+        jobs = {
+            # Builds the problem index, loading the upstream problemset only when the catalog uses it
+            "problem_index": get_problem_catalog().get_index(),
+            # Also decides whether cached rating histories are current
+            "contests": cf_client.get_contest_list(),
+            "users": cf_client.get_users_info(self.handles),
+            "leaderboard": get_leaderboard_service().refresh(),
+        }
+        if self.rating_history:
+            for handle in self.handles:
+                jobs[f"rating_history:{handle}"] = cf_client.get_user_rating_history(handle)
+        return jobs
+
+    async def _run(self) -> None:
+        """Run all jobs until they finish or the timeout expires"""
+        self.state = self.RUNNING
+        self.started_at = time.monotonic()
+        tasks = {asyncio.ensure_future(job): name for name, job in self._jobs().items()}
+        self.jobs = {name: self.RUNNING for name in tasks.values()}
+
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in done:
+            error = task.exception()
+            if error is not None:
+                logger.warning(f"Warmup of {tasks[task]} failed: {error}")
+                self.jobs[tasks[task]] = f"failed: {error}"
+            elif tasks[task] == "users":
+                missing = [handle for handle, user in task.result().items() if user is None]
+                self.jobs["users"] = f"missing: {', '.join(missing)}" if missing else self.DONE
+            else:
+                self.jobs[tasks[task]] = self.DONE
+        for task in pending:
+            task.cancel()
+            self.jobs[tasks[task]] = self.TIMED_OUT
+
+        self.finished_at = time.monotonic()
+        self.state = self.TIMED_OUT if pending else self.DONE
+        logger.info(f"Warmup {self.state} in {self.finished_at - self.started_at:.1f}s")
+
+
+# Singleton instance
+_warmup_service: Optional[WarmupService] = None
+
+def get_warmup_service() -> WarmupService:
+    """Get or create warmup service singleton"""
+    global _warmup_service
+    if _warmup_service is None:
+        handles = list(dict.fromkeys(settings.leaderboard_handles_list + settings.warmup_handles_list))
+        _warmup_service = WarmupService(
+            handles=handles,
+            timeout=settings.warmup_timeout_seconds,
+            rating_history=settings.warmup_rating_history,
+            enabled=settings.warmup_enabled
+        )
+    return _warmup_service
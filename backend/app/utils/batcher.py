@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from app.utils.deadline import deadline_scope
+
+logger = logging.getLogger(__name__)
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class MicroBatcher:
+    """Collect concurrent single-key loads into batched calls"""
+
+    def __init__(self, batch_fn: BatchFn, window: float = 0.01, max_size: int = 100):
+        """
+        Initialize batcher.
+
+        Args:
+            batch_fn: Coroutine taking a list of keys and returning a dict of results.
+                Keys missing from the returned dict resolve to None; exception
+                values are raised to the callers of that key only.
+            window: Seconds to wait for more keys after the first one arrives
+            max_size: Maximum number of keys per batch (flushes early when reached)
+        """
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_size = max_size
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Queue a key for the next batch and wait for its result.
+
+        The batch runs without a request deadline, whichever caller's key
+        started or filled it; callers bound their own wait (see within_deadline).
+        """
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+
+            # The timer callback and the batch task copy the current context
+            with deadline_scope(None):
+                if len(self._pending) >= self.max_size:
+                    self._flush()
+                elif self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        """Hand the pending keys to a background task running batch_fn"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._pending:
+            return
+
+        batch = list(self._pending.items())
+        self._pending = {}
+        asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        """Run one batch and resolve every waiting future"""
+        try:
+            results = await self.batch_fn([key for key, _ in batch])
+        except Exception as e:
+            logger.warning(f"Batch of {len(batch)} keys failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    # Avoid "exception never retrieved" when every caller went away
+                    future.exception()
+            return
+
+        for key, future in batch:
+            if future.done():
+                continue
+            result = results.get(key)
+            if isinstance(result, Exception):
+                future.set_exception(result)
+                future.exception()
+            else:
+                future.set_result(result)
@@ -1,32 +1,263 @@
-from cachetools import TTLCache
-from typing import Any, Optional
+import heapq
+import itertools
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
+EVICTION_POLICIES = ("lru", "lfu")
 
-class SimpleCache:
-    """Simple TTL-based cache wrapper"""
+# Heaps hold stale entries until they surface; rebuild once they outnumber live ones by this much
+HEAP_SLACK = 64
 
-    def __init__(self, maxsize: int = 1000, ttl: int = 300):
+
+@dataclass
+class CacheEntry:
+    """Cached value with the time it was stored, for freshness checks"""
+    value: Any
+    stored_at: float = field(default_factory=time.time)
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate memory footprint of a value in bytes.
+
+    Walks containers and object attributes, counting each object once, so a
+    10k-problem list weighs what it actually costs rather than "one entry".
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return size
+
+
+class _Item:
+    __slots__ = ("value", "size", "expires_at", "frequency", "used")
+
+    def __init__(self, value: Any, size: int, expires_at: float, used: int):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.frequency = 1
+        # Tick of the last set or hit; tells heap entries of the current state from outdated ones
+        self.used = used
+
+
+class CacheNamespace:
+    """TTL cache with a byte budget, evicting by LRU or LFU, that counts its own traffic"""
+
+    def __init__(self, name: str, ttl: float, max_bytes: int, policy: str = "lru"):
         """
-        Initialize cache.
+        Initialize namespace.
 
         Args:
-            maxsize: Maximum number of items to cache
-            ttl: Time-to-live in seconds (default: 5 minutes)
+            name: Namespace name, used in stats
+            ttl: Seconds an entry is kept after it is set
+            max_bytes: Memory budget (estimated) for keys and values together
+            policy: "lru" (least recently used) or "lfu" (least frequently used) eviction
         """
-        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy {policy!r}, expected one of {EVICTION_POLICIES}")
+
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.policy = policy
+        # Ordered from least to most recently used
+        self._items: "OrderedDict[str, _Item]" = OrderedDict()
+        # Min-heaps of (expires_at, tick, key) and, for LFU, (frequency, tick, key).
+        # Entries are not removed when an item changes or goes; they are skipped when popped
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._frequency_heap: List[Tuple[int, int, str]] = []
+        self._ticks = itertools.count()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
-        return self.cache.get(key)
+        item = self._items.get(key)
+        if item is not None and item.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            item = None
 
-    def set(self, key: str, value: Any) -> None:
-        """Set value in cache"""
-        self.cache[key] = value
+        if item is None:
+            self.misses += 1
+            return None
 
-    def clear(self) -> None:
-        """Clear all cache entries"""
-        self.cache.clear()
+        self.hits += 1
+        item.frequency += 1
+        self._items.move_to_end(key)
+        if self.policy == "lfu":
+            item.used = next(self._ticks)
+            self._push(self._frequency_heap, (item.frequency, item.used, key))
+        return item.value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Get an unexpired value without counting a lookup or refreshing its recency"""
+        item = self._items.get(key)
+        if item is None or item.expires_at <= time.monotonic():
+            return None
+        return item.value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Set value in cache, evicting other entries until it fits the budget.
+
+        Values larger than the whole budget are not cached.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            expires_at: Wall-clock time (time.time()) the entry expires at,
+                for values that started aging elsewhere; defaults to ttl from now
+        """
+        self.delete(key)
+        lifetime = self.ttl if expires_at is None else expires_at - time.time()
+        if lifetime <= 0:
+            return
+
+        size = estimate_size(key) + estimate_size(value)
+        if size > self.max_bytes:
+            self.rejected += 1
+            return
+
+        if self.bytes + size > self.max_bytes:
+            self.expire()
+        while self.bytes + size > self.max_bytes:
+            self._evict()
+
+        item = _Item(value, size, time.monotonic() + lifetime, next(self._ticks))
+        self._items[key] = item
+        self.bytes += size
+        self._push(self._expiry_heap, (item.expires_at, item.used, key))
+        if self.policy == "lfu":
+            self._push(self._frequency_heap, (item.frequency, item.used, key))
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present"""
+        if key in self._items:
+            self._remove(key)
 
     def has(self, key: str) -> bool:
-        """Check if key exists in cache"""
-        return key in self.cache
+        """Check if an unexpired key exists in cache (not counted as a hit or miss)"""
+        item = self._items.get(key)
+        return item is not None and item.expires_at > time.monotonic()
+
+    def expire(self) -> int:
+        """Drop expired entries and return how many were removed"""
+        now = time.monotonic()
+        expired = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry_heap)
+            item = self._items.get(key)
+            if item is not None and item.expires_at == expires_at:
+                self._remove(key)
+                expired += 1
+        self.expirations += expired
+        return expired
+
+    def clear(self) -> None:
+        """Clear all cache entries (counters are kept)"""
+        self._items.clear()
+        self._expiry_heap.clear()
+        self._frequency_heap.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and memory use of this namespace"""
+        lookups = self.hits + self.misses
+        return {
+            "policy": self.policy,
+            "ttl_seconds": self.ttl,
+            "entries": len(self._items),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+        }
+
+    def _remove(self, key: str) -> None:
+        item = self._items.pop(key)
+        self.bytes -= item.size
+
+    def _evict(self) -> None:
+        """Evict one entry according to the policy"""
+        if self.policy == "lru":
+            key = next(iter(self._items))
+        else:
+            # Ties go to the least recently used entry, which has the lowest tick
+            while True:
+                frequency, used, key = heapq.heappop(self._frequency_heap)
+                item = self._items.get(key)
+                if item is not None and item.frequency == frequency and item.used == used:
+                    break
+        self._remove(key)
+        self.evictions += 1
+
+    def _push(self, heap: list, entry: tuple) -> None:
+        """Add a heap entry, rebuilding the heap from live items when stale entries pile up"""
+        heapq.heappush(heap, entry)
+        if len(heap) <= 2 * len(self._items) + HEAP_SLACK:
+            return
+        if heap is self._expiry_heap:
+            heap[:] = [(item.expires_at, item.used, key) for key, item in self._items.items()]
+        else:
+            heap[:] = [(item.frequency, item.used, key) for key, item in self._items.items()]
+        heapq.heapify(heap)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class NamespacedCache:
+    """Set of named cache namespaces, each with its own TTL and byte budget"""
+
+    def __init__(self):
+        self.namespaces: Dict[str, CacheNamespace] = {}
+
+    def add(self, name: str, ttl: float, max_bytes: int, policy: str = "lru") -> CacheNamespace:
+        """Create a namespace and return it"""
+        namespace = CacheNamespace(name, ttl, max_bytes, policy)
+        self.namespaces[name] = namespace
+        return namespace
+
+    def __getitem__(self, name: str) -> CacheNamespace:
+        return self.namespaces[name]
+
+    def clear(self) -> None:
+        """Clear every namespace"""
+        for namespace in self.namespaces.values():
+            namespace.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-namespace stats plus memory totals"""
+        namespaces = {name: namespace.stats() for name, namespace in self.namespaces.items()}
+        return {
+            "bytes": sum(ns["bytes"] for ns in namespaces.values()),
+            "max_bytes": sum(ns["max_bytes"] for ns in namespaces.values()),
+            "namespaces": namespaces,
+        }
@@ -0,0 +1,84 @@
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Stop calling a failing dependency for a while instead of waiting on every call"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to stay open before letting a trial call through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open"""
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def raise_if_open(self) -> None:
+        """
+        Reject a call early, before it queues for anything, without taking the trial slot.
+
+        Raises:
+            CircuitOpenError: The circuit is open
+        """
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_flight):
+            retry_in = max(self.opened_at + self.reset_timeout - time.monotonic(), 0)
+            raise CircuitOpenError(f"Circuit open, retry in {retry_in:.1f}s")
+
+    def check(self) -> bool:
+        """
+        Allow or reject a call.
+
+        When half open, only one trial call is let through until it reports
+        back or is released.
+
+        Returns:
+            True if the call is the trial; the caller must then record an
+            outcome or call release_trial() on every exit path
+
+        Raises:
+            CircuitOpenError: The circuit is open
+        """
+        self.raise_if_open()
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Give up the trial slot without an outcome (cancelled or out of time)"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, (re)opening the circuit at the threshold"""
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
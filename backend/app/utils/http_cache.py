@@ -0,0 +1,162 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlencode
+import orjson
+from fastapi import Request, Response
+from app.config import settings
+from app.utils.cache import CacheNamespace
+
+# Same options as fastapi.responses.ORJSONResponse, so cached and uncached bodies are identical
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+@dataclass
+class EncodedBody:
+    """Response body encoded once, ready to be served many times"""
+    body: bytes
+    gzipped: Optional[bytes]
+    etag: str
+
+    @property
+    def gzip_etag(self) -> str:
+        """Strong ETags must differ between content codings"""
+        return self.etag[:-1] + '-gzip"'
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """
+    Check an If-None-Match header against the ETags of a resource.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    W/ prefix added by a proxy does not defeat revalidation.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") in etags for tag in candidates)
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Whether the client accepts a gzip-coded response"""
+    for coding in request.headers.get("accept-encoding", "").lower().split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def encode_body(content: Any) -> EncodedBody:
+    """Serialize content to JSON, gzip it when large enough, and hash it"""
+    body = orjson.dumps(content, option=ORJSON_OPTIONS)
+    gzipped = None
+    if len(body) >= settings.response_gzip_min_bytes:
+        gzipped = gzip.compress(body, compresslevel=6, mtime=0)
+    return EncodedBody(body, gzipped, make_etag(body))
+
+
+def encoded_response(request: Request, encoded: EncodedBody, max_age: int) -> Response:
+    """
+    Serve an encoded body with ETag and Cache-Control, or answer 304.
+
+    The gzipped body is used when the client accepts it.
+    """
+    use_gzip = encoded.gzipped is not None and accepts_gzip(request)
+    headers = {
+        "ETag": encoded.gzip_etag if use_gzip else encoded.etag,
+        "Cache-Control": f"public, max-age={max_age}",
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), encoded.etag, encoded.gzip_etag):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(encoded.gzipped, media_type="application/json", headers=headers)
+    return Response(encoded.body, media_type="application/json", headers=headers)
+
+
+def cached_json_response(request: Request, content: Any, max_age: int) -> Response:
+    """
+    Render content as JSON with an ETag and Cache-Control, or answer 304.
+
+    Args:
+        request: Incoming request (its If-None-Match header is honored)
+        content: JSON-serializable payload
+        max_age: Seconds clients and shared caches may reuse the response,
+            normally the TTL of the data behind the endpoint
+
+    Returns:
+        200 JSON response, or an empty 304 when the client already has this body
+    """
+    return encoded_response(request, encode_body(content), max_age)
+
+
+def response_cache_key(request: Request) -> str:
+    """
+    Cache key for a request: route template, path parameters and normalized query.
+
+    Path parameters are lowercased (handles are case-insensitive) and query
+    parameters are sorted with empty values dropped, so equivalent URLs share
+    one entry.
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path", request.url.path)
+    path_params = sorted((name, str(value).lower()) for name, value in request.path_params.items())
+    query = sorted((name, value) for name, value in request.query_params.multi_items() if value != "")
+    return f"{template}|{urlencode(path_params)}|{urlencode(query)}"
+
+
+async def cached_endpoint_response(
+    request: Request,
+    build: Callable[[], Awaitable[Any]],
+    max_age: int,
+    key: Optional[str] = None
+) -> Response:
+    """
+    Serve a response body from the response cache, building and encoding it on a miss.
+
+    A hit skips the endpoint's work and the JSON encoding entirely: the
+    cached bytes (or their gzipped copy) are sent as they are. Errors raised
+    by build (e.g. 404) are not cached.
+
+    Args:
+        request: Incoming request
+        build: Coroutine factory producing the payload
+        max_age: Cache-Control max-age for clients
+        key: Cache key (defaults to response_cache_key(request)); include a
+            data version in it to make entries exact rather than TTL-bound
+    """
+    cache = get_response_cache()
+    key = key or response_cache_key(request)
+
+    encoded = cache.get(key)
+    if encoded is None:
+        encoded = encode_body(await build())
+        cache.set(key, encoded)
+    return encoded_response(request, encoded, max_age)
+
+
+# Singleton instance
+_response_cache: Optional[CacheNamespace] = None
+
+def get_response_cache() -> CacheNamespace:
+    """Get or create the encoded response cache"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = CacheNamespace(
+            "responses",
+            ttl=settings.response_cache_ttl_seconds,
+            max_bytes=settings.response_cache_max_bytes,
+            policy=settings.cache_eviction_policy
+        )
+    return _response_cache
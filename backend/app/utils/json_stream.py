@@ -0,0 +1,119 @@
+import json
+from typing import Any, AsyncIterator, Iterable, Set, Tuple
+
+Path = Tuple[str, ...]
+
+WHITESPACE = " \t\n\r"
+
+# Drop consumed text from the buffer once this many characters have been parsed
+COMPACT_THRESHOLD = 1 << 16
+
+
+class JSONStreamParser:
+    """
+    Incremental JSON parser that yields array items as soon as they are complete.
+
+    Only the arrays at the requested paths (and the objects leading to them)
+    are walked incrementally; every other value is decoded whole with the
+    standard decoder and yielded with its path. Consumed text is discarded as
+    parsing progresses, so the full document is never held in memory.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], array_paths: Iterable[Path]):
+        """
+        Initialize parser.
+
+        Args:
+            chunks: Async iterator of text chunks (e.g. httpx Response.aiter_text())
+            array_paths: Paths of arrays whose items should be streamed,
+                e.g. ("result", "problems")
+        """
+        self.chunks = chunks
+        self.array_paths: Set[Path] = set(array_paths)
+        self.prefixes: Set[Path] = {path[:i] for path in self.array_paths for i in range(len(path))}
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def __aiter__(self) -> AsyncIterator[Tuple[Path, Any]]:
+        return self._parse(())
+
+    async def _fill(self) -> bool:
+        """Read one more chunk into the buffer; False once the input is exhausted"""
+        if self.eof:
+            return False
+
+        if self.pos > COMPACT_THRESHOLD:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        try:
+            self.buf += await self.chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            return False
+        return True
+
+    async def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not await self._fill():
+                return ""
+
+    async def _expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars"""
+        char = await self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+    async def _read_value(self) -> Any:
+        """Decode one complete JSON value, reading more input as needed"""
+        await self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number or literal at the very end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            await self._fill()
+
+    async def _parse(self, path: Path) -> AsyncIterator[Tuple[Path, Any]]:
+        """Parse the value at path, yielding (path, value) events"""
+        char = await self._peek()
+
+        if path in self.array_paths and char == "[":
+            self.pos += 1
+            if await self._peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                yield path, await self._read_value()
+                if await self._expect(",]") == "]":
+                    return
+
+        elif path in self.prefixes and char == "{":
+            self.pos += 1
+            if await self._peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                key = await self._read_value()
+                await self._expect(":")
+                async for event in self._parse(path + (key,)):
+                    yield event
+                if await self._expect(",}") == "}":
+                    return
+
+        else:
+            yield path, await self._read_value()
@@ -0,0 +1,36 @@
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies with cheap percentile lookups"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initialize tracker.
+
+        Args:
+            window: Number of most recent samples kept
+            min_samples: Samples required before percentiles are reported
+        """
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._sorted: Optional[list] = None
+
+    def record(self, seconds: float) -> None:
+        """Record one latency sample"""
+        self.samples.append(seconds)
+        self._sorted = None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Latency at percentile p (0-100), or None until enough samples exist.
+
+        The sorted window is cached until the next sample is recorded.
+        """
+        if len(self.samples) < self.min_samples:
+            return None
+        if self._sorted is None:
+            self._sorted = sorted(self.samples)
+        index = min(int(len(self._sorted) * p / 100), len(self._sorted) - 1)
+        return self._sorted[index]
@@ -0,0 +1,212 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
+import numpy as np
+
+FIELD_SEPARATOR = "\n"
+DOCUMENT_SEPARATOR = "\x00"
+
+# A gram is encoded as up to three 21-bit code points; the top bits mark prefix grams
+CODE_BITS = 21
+WORD_START_FLAG = np.uint64(1 << 63)
+FIELD_START_FLAG = np.uint64(1 << 62)
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def _gram_code(gram: str) -> int:
+    code = 0
+    for i, char in enumerate(gram):
+        code |= ord(char) << (CODE_BITS * i)
+    return code
+
+
+def _shift(values: np.ndarray, n: int, fill) -> np.ndarray:
+    """values moved n places left, padded with fill"""
+    shifted = np.full(len(values), fill, dtype=values.dtype)
+    shifted[:max(len(values) - n, 0)] = values[n:]
+    return shifted
+
+
+def _grams(text: str, n: int) -> List[str]:
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+class NGramIndex:
+    """
+    Substring, prefix and fuzzy search over a fixed list of documents.
+
+    Every 1-, 2- and 3-gram of a document, plus the first 1-3 characters of
+    each word and field, is posted to a sorted array of document numbers.
+    A query of up to three characters is then a single posting lookup. For
+    longer ones the trigram starting at every text position is also kept,
+    with the positions sorted by trigram: the positions of the query's
+    rarest trigram are the candidate match starts, and comparing the
+    trigrams at a few fixed offsets from them confirms every candidate at
+    once, exactly. When nothing contains the query, documents
+    sharing most of its trigrams are returned instead, which tolerates
+    typos. The postings are built with array operations over the encoded
+    text, not per-gram Python loops, so rebuilding for a new catalogue is
+    cheap.
+    """
+
+    def __init__(self, documents: List[List[str]]):
+        """
+        Build the index.
+
+        Args:
+            documents: For each document, its searchable fields (e.g. id, name, contest name)
+        """
+        self.size = len(documents)
+        self.texts: List[str] = []
+        self.exact: Dict[str, List[int]] = defaultdict(list)
+        for doc, fields in enumerate(documents):
+            fields = [normalize(field) for field in fields if field]
+            self.texts.append(FIELD_SEPARATOR.join(fields))
+            for field in fields:
+                self.exact[field].append(doc)
+
+        text = "".join(t + DOCUMENT_SEPARATOR for t in self.texts)
+        chars = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        docs = np.repeat(np.arange(self.size, dtype=np.int32), [len(t) + 1 for t in self.texts])
+
+        separator = (chars == ord(FIELD_SEPARATOR)) | (chars == ord(DOCUMENT_SEPARATOR))
+        space = chars == ord(" ")
+        previous = np.concatenate(([ord(DOCUMENT_SEPARATOR)], chars[:-1]))
+        field_start = ~separator & ((previous == ord(FIELD_SEPARATOR)) | (previous == ord(DOCUMENT_SEPARATOR)))
+        word_start = ~separator & ~space & (field_start | (previous == ord(" ")))
+
+        codes = []
+        owners = []
+        gram = np.zeros(len(chars), dtype=np.uint64)
+        in_field = np.ones(len(chars), dtype=bool)
+        in_word = np.ones(len(chars), dtype=bool)
+        for n in (1, 2, 3):
+            # Extend every window by one character; windows running off the end are invalid
+            gram |= _shift(chars, n - 1, 0) << np.uint64(CODE_BITS * (n - 1))
+            tail_separator = _shift(separator, n - 1, True)
+            in_field &= ~tail_separator
+            in_word &= ~tail_separator & ~_shift(space, n - 1, True)
+
+            if n == 3:
+                trigrams = gram.copy()
+            codes += [gram[in_field], gram[in_word & word_start] | WORD_START_FLAG,
+                      gram[in_field & field_start] | FIELD_START_FLAG]
+            owners += [docs[in_field], docs[in_word & word_start], docs[in_field & field_start]]
+
+        codes = np.concatenate(codes)
+        owners = np.concatenate(owners)
+        order = np.lexsort((owners, codes))
+        codes, owners = codes[order], owners[order]
+        distinct = np.ones(len(codes), dtype=bool)
+        distinct[1:] = (codes[1:] != codes[:-1]) | (owners[1:] != owners[:-1])
+        codes, owners = codes[distinct], owners[distinct]
+
+        # Postings of gram_codes[i] are posting_docs[posting_starts[i]:posting_starts[i + 1]]
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+        self.gram_codes = codes[first]
+        self.posting_starts = np.append(np.flatnonzero(first), len(codes))
+        self.posting_docs = owners
+
+        # Positions starting with trigram_codes[i] are positions[trigram_starts[i]:trigram_starts[i + 1]];
+        # trigrams running over a separator or the end never equal one from a query
+        order = np.argsort(trigrams, kind="stable")
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = trigrams[order[1:]] != trigrams[order[:-1]]
+        self.trigram_at = trigrams
+        self.trigram_codes = trigrams[order][first]
+        self.trigram_starts = np.append(np.flatnonzero(first), len(order))
+        self.positions = order.astype(np.int32)
+        self.position_docs = docs
+        self._none = np.empty(0, dtype=np.int32)
+
+    def _posting(self, code: int) -> np.ndarray:
+        """Sorted documents posted under an encoded gram"""
+        i = int(np.searchsorted(self.gram_codes, np.uint64(code)))
+        if i == len(self.gram_codes) or self.gram_codes[i] != code:
+            return self._none
+        return self.posting_docs[self.posting_starts[i]:self.posting_starts[i + 1]]
+
+    def contains(self, query: str) -> np.ndarray:
+        """Sorted documents containing the query as a substring"""
+        query = normalize(query)
+        if not query or DOCUMENT_SEPARATOR in query:
+            return self._none
+        if len(query) <= 3:
+            return self._posting(_gram_code(query))
+
+        codes = np.array([_gram_code(gram) for gram in _grams(query, 3)], dtype=np.uint64)
+        found = np.searchsorted(self.trigram_codes, codes)
+        if (found == len(self.trigram_codes)).any() or (self.trigram_codes[found] != codes).any():
+            return self._none
+
+        # Anchor on the rarest trigram, then check trigrams covering the rest of the query
+        counts = self.trigram_starts[found + 1] - self.trigram_starts[found]
+        anchor = int(np.argmin(counts))
+        i = found[anchor]
+        starts = self.positions[self.trigram_starts[i]:self.trigram_starts[i + 1]] - anchor
+        last = len(codes) - 1
+        starts = starts[(starts >= 0) & (starts + last < len(self.trigram_at))]
+        for offset in sorted((set(range(0, last, 3)) | {last}) - {anchor}):
+            starts = starts[self.trigram_at[starts + offset] == codes[offset]]
+        # Positions are ascending, so matches in the same document are adjacent
+        docs = self.position_docs[starts]
+        return docs[np.append(True, docs[1:] != docs[:-1])] if len(docs) else self._none
+
+    def prefix_of_word(self, query: str) -> np.ndarray:
+        """Sorted documents with a word starting with the query (first three characters for longer queries)"""
+        return self._posting(_gram_code(normalize(query)[:3]) | int(WORD_START_FLAG))
+
+    def prefix_of_field(self, query: str) -> np.ndarray:
+        """Sorted documents with a field starting with the query (first three characters for longer queries)"""
+        return self._posting(_gram_code(normalize(query)[:3]) | int(FIELD_START_FLAG))
+
+    def similar(self, query: str, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Documents sharing at least a threshold fraction of the query's trigrams.
+
+        Returns:
+            (documents, fraction of the query trigrams each one contains)
+        """
+        grams = set(_grams(normalize(query), 3))
+        if len(grams) < 2:
+            return self._none, np.empty(0)
+        hits = np.bincount(
+            np.concatenate([self._posting(_gram_code(gram)) for gram in grams]),
+            minlength=self.size
+        )
+        similarity = hits / len(grams)
+        docs = np.flatnonzero(similarity >= threshold).astype(np.int32)
+        return docs, similarity[docs]
+
+    def search(self, query: str, fuzzy_threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Matching documents with relevance scores (higher is better).
+
+        Substring matches score 1, plus 0.5 when a word starts with the
+        query, 0.5 when a field starts with it and 2 when a field equals it.
+        Fuzzy matches, used only when no document contains the query, score
+        the fraction of trigrams they share with it (below 1).
+
+        Returns:
+            (documents, scores), documents sorted ascending
+        """
+        query = normalize(query)
+        if not query:
+            return self._none, np.empty(0)
+
+        docs = self.contains(query)
+        if not len(docs):
+            return self.similar(query, fuzzy_threshold)
+
+        bonus = np.zeros(self.size)
+        bonus[self.prefix_of_word(query)] += 0.5
+        bonus[self.prefix_of_field(query)] += 0.5
+        bonus[self.exact.get(query, [])] += 2.0
+        return docs, 1.0 + bonus[docs]
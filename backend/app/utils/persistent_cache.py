@@ -0,0 +1,81 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+from app.utils.cache import CacheEntry
+
+
+class PersistentCache:
+    """SQLite-backed cache that keeps entries (and their TTL metadata) across restarts"""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self.purge_expired()
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """Get an unexpired entry, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, time.time())
+            ).fetchone()
+
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), stored_at=row[1])
+
+    def set(self, namespace: str, key: str, entry: CacheEntry, ttl: float) -> None:
+        """
+        Store an entry.
+
+        Args:
+            namespace: Group of keys (usually the upstream method)
+            key: Cache key
+            entry: Value and the time it was fetched
+            ttl: Seconds after stored_at when the entry stops being served
+        """
+        value = json.dumps(entry.value, separators=(",", ":"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, value, entry.stored_at, entry.stored_at + ttl)
+            )
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed"""
+        with self.lock:
+            cursor = self.conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Clear all cache entries"""
+        with self.lock:
+            self.conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        """Close the database"""
+        with self.lock:
+            self.conn.close()
@@ -1,7 +1,24 @@
 import time
 import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import stat
+import struct
 from collections import deque
-from typing import Deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Deque, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
@@ -44,3 +61,226 @@ class RateLimiter:
 
             # Record this call
             self.calls.append(time.time())
+
+    def try_acquire(self) -> float:
+        """
+        Record a call if the limit allows it, without waiting.
+
+        Returns:
+            0 if the call is allowed, else seconds until it would be
+        """
+        now = time.time()
+
+        # Remove calls outside the time window
+        while self.calls and self.calls[0] < now - self.period:
+            self.calls.popleft()
+
+        if len(self.calls) >= self.max_calls:
+            return self.calls[0] + self.period - now
+
+        self.calls.append(now)
+        return 0
+
+
+class Priority(IntEnum):
+    """Priority classes for outbound calls (lower value is served first)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+    WARMUP = 2
+
+
+_current_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    """Get the priority class of the running task"""
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Run a block (and the tasks it spawns) under the given priority class.
+
+    Calls made outside any block are treated as interactive.
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class SharedTokenBucket:
+    """
+    Token bucket whose state lives in a small file shared by every process on the host.
+
+    Each take locks the file (flock), refills tokens for the time elapsed
+    since the last update, and writes the new state back, so all uvicorn
+    workers draw from one budget without any external service.
+    """
+
+    STATE = struct.Struct("dd")  # tokens, last update (wall clock)
+
+    def __init__(self, path: str, rate: float, capacity: float):
+        """
+        Open (or create) the shared bucket.
+
+        Args:
+            path: State file shared by all processes
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+
+        Raises:
+            OSError: The file cannot be opened, is a symlink, or is not a
+                regular file owned by this process's user
+        """
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+        # Refuse symlinks and files planted by other users, who could stall or crash us through it
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_NOFOLLOW", 0), 0o600)
+        info = os.fstat(self.fd)
+        if not stat.S_ISREG(info.st_mode) or info.st_uid != os.getuid():
+            os.close(self.fd)
+            raise PermissionError(f"{path} is not a regular file owned by this user")
+
+    def try_take(self) -> float:
+        """
+        Take one token if available.
+
+        Returns:
+            0 if a token was taken, else seconds until the next token is due
+        """
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            data = os.pread(self.fd, self.STATE.size, 0)
+            tokens, updated = self.capacity, now
+            if len(data) == self.STATE.size:
+                tokens, updated = self.STATE.unpack(data)
+                # Clamp corrupt state so it cannot stall every caller
+                tokens = self.capacity if math.isnan(tokens) else min(max(tokens, 0.0), self.capacity)
+                if not math.isfinite(updated) or updated > now:
+                    updated = now
+                tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+
+            os.pwrite(self.fd, self.STATE.pack(tokens, now), 0)
+            return wait
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        """Close the state file"""
+        os.close(self.fd)
+
+
+class PriorityRateLimiter:
+    """Rate limiter that grants free slots to waiting callers by priority class"""
+
+    def __init__(self, max_calls: int = 5, period: float = 1.0, shared_state_path: Optional[str] = None):
+        """
+        Initialize rate limiter.
+
+        Args:
+            max_calls: Maximum number of calls allowed in the period
+            period: Time period in seconds
+            shared_state_path: If set, slots come from a SharedTokenBucket at this
+                path so the limit holds across processes; otherwise from an
+                in-process sliding window
+        """
+        self.max_calls = max_calls
+        self.period = period
+        self.calls: Deque[float] = deque()
+        self.shared: Optional[SharedTokenBucket] = None
+        if shared_state_path:
+            if fcntl is None:
+                logger.warning("Shared rate limit state needs fcntl (POSIX); limiting per process instead")
+            else:
+                try:
+                    self.shared = SharedTokenBucket(shared_state_path, rate=max_calls / period, capacity=max_calls)
+                except OSError as e:
+                    logger.warning(f"Cannot use shared rate limit state {shared_state_path}: {e}; limiting per process instead")
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def acquire(self, priority: Optional[Priority] = None):
+        """
+        Acquire permission to make an API call.
+
+        Waiting callers are served highest priority first, FIFO within a
+        priority class, so queued background work never delays interactive calls
+        by more than the calls already granted.
+
+        Args:
+            priority: Priority class (defaults to the current context's priority)
+        """
+        if priority is None:
+            priority = current_priority()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self._dispatch()
+        await future
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now and nobody is waiting"""
+        if self.queued:
+            return False
+        return self._take_slot() == 0
+
+    @property
+    def queued(self) -> int:
+        """Number of callers waiting for a slot"""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def close(self) -> None:
+        """Stop the wake-up timer and close the shared state file"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def _take_slot(self) -> float:
+        """Take a slot if one is free; return 0, or seconds until one should be"""
+        if self.shared is not None:
+            return self.shared.try_take()
+
+        now = time.monotonic()
+
+        # Remove calls outside the time window
+        while self.calls and self.calls[0] <= now - self.period:
+            self.calls.popleft()
+
+        if len(self.calls) >= self.max_calls:
+            return self.calls[0] + self.period - now
+        self.calls.append(now)
+        return 0
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters and schedule a wake-up for the rest"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            if self._waiters[0][2].done():  # caller was cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+
+            wait = self._take_slot()
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            _, _, future = heapq.heappop(self._waiters)
+            future.set_result(None)
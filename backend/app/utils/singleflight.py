@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from app.utils.deadline import deadline_scope
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers sharing the same key.
+
+        The first caller starts the work as a task; every caller that arrives
+        while it is running awaits the same result (or exception). A caller
+        being cancelled does not cancel the shared work. The work runs
+        without a request deadline, so it does not fail for everyone when
+        the caller that started it runs out of time; callers bound their own
+        wait (see within_deadline).
+
+        Args:
+            key: Identity of the work being coalesced
+            fn: Zero-argument coroutine factory doing the actual work
+
+        Returns:
+            The result of fn
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            with deadline_scope(None):
+                future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        """Drop a finished flight and mark its exception as retrieved"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
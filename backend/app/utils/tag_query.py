@@ -0,0 +1,145 @@
+"""
+Boolean tag expressions over packed bitmaps.
+
+Syntax (operators are upper case, since tags such as "divide and conquer"
+contain lower-case "and"):
+
+    dp AND graphs
+    dp AND (graphs OR trees) AND NOT implementation
+    "number theory" OR math
+
+`&`, `|` and `!` are accepted as AND, OR and NOT. A tag is one or more words
+(or a double-quoted string) and is matched case-insensitively.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, List, Tuple, Union
+import numpy as np
+
+OPERATORS = {"AND": "AND", "&": "AND", "OR": "OR", "|": "OR", "NOT": "NOT", "!": "NOT"}
+
+TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|(&|\||!)|"([^"]*)"|([^\s()&|!"]+))')
+
+# ("tag", name) | ("not", node) | ("and", [nodes]) | ("or", [nodes])
+Node = Tuple[str, Union[str, "Node", List["Node"]]]
+
+
+class TagQueryError(ValueError):
+    """Raised for a malformed tag expression"""
+
+
+def _tokenize(query: str) -> List[Tuple[str, str]]:
+    """Split a query into (kind, text) tokens, joining consecutive words into one tag"""
+    tokens: List[Tuple[str, str]] = []
+    pos = 0
+    query = query.rstrip()
+    previous_word = False
+    while pos < len(query):
+        match = TOKEN_RE.match(query, pos)
+        if not match or match.end() == pos:
+            raise TagQueryError(f"Unexpected character at position {pos}")
+        pos = match.end()
+        lparen, rparen, symbol, quoted, word = match.groups()
+        is_word = False
+
+        if lparen or rparen:
+            tokens.append(("(", "(") if lparen else (")", ")"))
+        elif symbol or word in OPERATORS:
+            tokens.append(("op", OPERATORS[symbol or word]))
+        elif quoted is not None:
+            tokens.append(("tag", quoted.strip().lower()))
+        elif previous_word:
+            tokens[-1] = ("tag", f"{tokens[-1][1]} {word.lower()}")
+            is_word = True
+        else:
+            tokens.append(("tag", word.lower()))
+            is_word = True
+        previous_word = is_word
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser: or := and (OR and)*, and := not (AND not)*, not := NOT not | atom"""
+
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("end", "")
+
+    def parse(self) -> Node:
+        node = self._or()
+        if self._peek()[0] != "end":
+            raise TagQueryError(f"Unexpected {self._peek()[1]!r}")
+        return node
+
+    def _or(self) -> Node:
+        nodes = [self._and()]
+        while self._peek() == ("op", "OR"):
+            self.pos += 1
+            nodes.append(self._and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def _and(self) -> Node:
+        nodes = [self._not()]
+        while self._peek() == ("op", "AND"):
+            self.pos += 1
+            nodes.append(self._not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def _not(self) -> Node:
+        if self._peek() == ("op", "NOT"):
+            self.pos += 1
+            return ("not", self._not())
+        return self._atom()
+
+    def _atom(self) -> Node:
+        kind, text = self._peek()
+        self.pos += 1
+        if kind == "tag":
+            return ("tag", text)
+        if kind == "(":
+            node = self._or()
+            if self._peek()[0] != ")":
+                raise TagQueryError("Missing closing parenthesis")
+            self.pos += 1
+            return node
+        raise TagQueryError(f"Expected a tag, got {text!r}" if text else "Expected a tag, got end of query")
+
+
+@lru_cache(maxsize=1024)
+def parse_tag_query(query: str) -> Node:
+    """
+    Parse a tag expression.
+
+    Raises:
+        TagQueryError: The expression is malformed
+    """
+    return _Parser(_tokenize(query)).parse()
+
+
+def evaluate_tag_query(node: Node, bitmap: Callable[[str], np.ndarray], universe: np.ndarray) -> np.ndarray:
+    """
+    Evaluate a parsed expression with bitmap intersections, unions and complements.
+
+    Args:
+        node: Parsed expression
+        bitmap: Packed bitmap (np.packbits) of the problems having a tag
+        universe: Packed bitmap of all problems (bounds NOT to real rows)
+
+    Returns:
+        Packed bitmap of the matching problems
+    """
+    kind, value = node
+    if kind == "tag":
+        return bitmap(value)
+    if kind == "not":
+        return np.bitwise_and(np.bitwise_not(evaluate_tag_query(value, bitmap, universe)), universe)
+
+    combine = np.bitwise_and if kind == "and" else np.bitwise_or
+    result = evaluate_tag_query(value[0], bitmap, universe).copy()
+    for child in value[1:]:
+        combine(result, evaluate_tag_query(child, bitmap, universe), out=result)
+    return result
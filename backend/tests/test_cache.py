@@ -0,0 +1,45 @@
+import time
+from app.utils.cache import CacheNamespace
+
+
+def test_expires_at_keeps_the_original_lifetime():
+    cache = CacheNamespace("test", ttl=100, max_bytes=1024 * 1024)
+    cache.set("aged", "value", expires_at=time.time() + 0.05)
+    cache.set("expired", "value", expires_at=time.time() - 1)
+    cache.set("fresh", "value")
+
+    assert cache.get("aged") == "value"
+    assert cache.get("expired") is None
+    time.sleep(0.1)
+    assert cache.get("aged") is None
+    assert cache.get("fresh") == "value"
+
+
+def test_lfu_evicts_the_least_frequently_then_least_recently_used():
+    cache = CacheNamespace("test", ttl=100, max_bytes=1024 * 1024, policy="lfu")
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+    cache.get("c")
+    cache.get("c")
+    cache.set("b", "b")
+
+    cache._evict()
+    assert "b" not in cache._items
+    cache._evict()
+    assert "a" not in cache._items
+    assert cache.get("c") == "c"
+
+
+def test_full_namespace_drops_expired_entries_before_evicting():
+    cache = CacheNamespace("test", ttl=100, max_bytes=1024 * 1024)
+    for i in range(50):
+        cache.set(f"old{i}", "x" * 100, expires_at=time.time() + 0.01)
+    cache.set("live", "x" * 100)
+    cache.max_bytes = cache.bytes
+    time.sleep(0.02)
+
+    cache.set("new", "x" * 100)
+    assert cache.evictions == 0
+    assert cache.expirations == 50
+    assert cache.get("live") is not None and cache.get("new") is not None
@@ -0,0 +1,93 @@
+import asyncio
+import time
+import httpx
+import pytest
+from app.config import settings
+from app.services.codeforces_client import CodeforcesClient
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.deadline import DeadlineExceeded, deadline_scope
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(monkeypatch):
+    monkeypatch.setattr(settings, "persistent_cache_path", "")
+    monkeypatch.setattr(settings, "rate_limit_shared_state_path", "")
+    monkeypatch.setattr(settings, "http_max_retries", 0)
+    monkeypatch.setattr(settings, "hedging_enabled", False)
+    monkeypatch.setattr(settings, "circuit_breaker_failure_threshold", 1)
+    monkeypatch.setattr(settings, "circuit_breaker_reset_seconds", 0.05)
+
+
+def make_client(monkeypatch, handler, rate_limit_calls: int = 100) -> CodeforcesClient:
+    monkeypatch.setattr(settings, "rate_limit_calls", rate_limit_calls)
+    monkeypatch.setattr(settings, "rate_limit_period", 10.0)
+    return CodeforcesClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+async def trip(client: CodeforcesClient) -> None:
+    """Fail one call so the breaker opens, then wait until it is half open"""
+    with pytest.raises(httpx.TransportError):
+        await client._get("https://codeforces.test/api/contest.list")
+    await asyncio.sleep(settings.circuit_breaker_reset_seconds * 2)
+    assert client._breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_release_trial_lets_the_next_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.release_trial()
+    assert breaker.check() is True
+
+
+def test_deadline_while_queued_on_rate_limiter_holds_no_trial(monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("down", request=request)
+
+    async def run() -> None:
+        client = make_client(monkeypatch, handler, rate_limit_calls=1)
+        await trip(client)
+
+        # The only slot of the period is used up, so the trial times out in the queue
+        with deadline_scope(0.05), pytest.raises(DeadlineExceeded):
+            await client._get("https://codeforces.test/api/contest.list")
+
+        assert not client._breaker._trial_in_flight
+        assert client._breaker.check() is True
+        await client.close()
+
+    asyncio.run(run())
+
+
+def test_cancelled_trial_is_released(monkeypatch):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise httpx.ConnectError("down", request=request)
+        if calls == 2:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"status": "OK", "result": []})
+
+    async def run() -> None:
+        client = make_client(monkeypatch, handler)
+        await trip(client)
+
+        trial = asyncio.ensure_future(client._get("https://codeforces.test/api/contest.list"))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        started = time.monotonic()
+        response = await client._get("https://codeforces.test/api/contest.list")
+        assert response.status_code == 200
+        assert time.monotonic() - started < 1
+        assert client._breaker.state == CircuitBreaker.CLOSED
+        await client.close()
+
+    asyncio.run(run())
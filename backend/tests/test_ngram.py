@@ -0,0 +1,35 @@
+import random
+from app.utils.ngram import NGramIndex, normalize
+
+
+def _documents():
+    rng = random.Random(7)
+    words = ["tree", "path", "robots", "array", "queries", "game", "strings", "sum"]
+    documents = []
+    for i in range(2000):
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(1, 3)))
+        contest = f"Codeforces Round {rng.randint(1, 999)} (Div. {rng.randint(1, 3)})"
+        documents.append([f"{i}A", name, contest])
+    return documents
+
+
+def test_contains_matches_substring_search():
+    documents = _documents()
+    index = NGramIndex(documents)
+    texts = ["\n".join(normalize(field) for field in fields) for fields in documents]
+
+    # Trigrams spread across fields must not be taken for a match
+    queries = ["ces rob", "round 1", "codeforces round 12", "tree path", "div. 3)", "s rou", "zzzz"]
+    rng = random.Random(11)
+    for _ in range(300):
+        text = rng.choice(texts)
+        start = rng.randrange(len(text))
+        queries.append(text[start:start + rng.randint(4, 16)].replace("\n", " "))
+
+    for query in queries:
+        expected = [doc for doc, text in enumerate(texts) if normalize(query) in text]
+        assert index.contains(query).tolist() == expected, query
+
+
+def test_contains_on_empty_index():
+    assert NGramIndex([]).contains("round").tolist() == []
@@ -0,0 +1,108 @@
+import asyncio
+import base64
+import numpy as np
+import orjson
+import pytest
+from app.services import problem_catalog
+from app.services.problem_catalog import CursorError, ProblemCatalog, query_digest
+
+
+def make_problems(count: int, contest_offset: int = 0):
+    return [
+        {"id": f"{100 + contest_offset + i}A", "name": f"Problem {i}", "rating": 800, "tags": ["math"], "solved_count": 10}
+        for i in range(count)
+    ]
+
+
+def forge(payload) -> str:
+    raw = payload.encode() if isinstance(payload, str) else orjson.dumps(payload)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def read_all(index, cursor, sort_by="rating", limit=3):
+    ids = []
+    mask = np.ones(len(index), dtype=bool)
+    position = index.decode_cursor(cursor, sort_by) if cursor else 0
+    while position >= 0:
+        rows, position = index.page(mask, sort_by, position, limit)
+        ids += [problem["id"] for problem in index.rows(rows)]
+    return ids
+
+
+def test_keyset_resume_after_reload_keeps_tied_rows():
+    catalog = ProblemCatalog()
+    old = catalog.reload(make_problems(10))
+    rows, position = old.page(np.ones(len(old), dtype=bool), "rating", 0, 3)
+    first_page = [problem["id"] for problem in old.rows(rows)]
+    cursor = old.encode_cursor("rating", position)
+
+    # A problem is added and everything is still rated 800
+    new = catalog.reload(make_problems(10) + [{"id": "99A", "name": "New", "rating": 800, "tags": [], "solved_count": 1}])
+    assert new.version != old.version
+
+    rest = read_all(new, cursor)
+    assert set(first_page + rest) >= {problem["id"] for problem in make_problems(10)}
+    assert not set(first_page) & set(rest)
+
+
+def test_version_is_derived_from_the_data():
+    assert ProblemCatalog().reload(make_problems(5)).version == ProblemCatalog().reload(make_problems(5)).version
+    assert ProblemCatalog().reload(make_problems(5)).version != ProblemCatalog().reload(make_problems(6)).version
+
+
+def test_relevance_cursor_from_another_version_is_rejected():
+    catalog = ProblemCatalog()
+    old = catalog.reload(make_problems(10))
+    cursor = old.encode_cursor("relevance", 3)
+    new = catalog.reload(make_problems(11))
+    with pytest.raises(CursorError):
+        new.decode_cursor(cursor, "relevance")
+
+
+@pytest.mark.parametrize("payload, sort_by", [
+    (["stale", "relevance", "", 3, 5], "relevance"),
+    (["stale", "rating", "", 2, [1], "100A"], "rating"),
+    (["stale", "rating", "", 2, 800, 7], "rating"),
+    ('["stale", "rating", "", 2, 1000000000000000000000000000000, "100A"]', "rating"),
+    (["stale", "rating", "", 2, 9 * 10 ** 18, "100A"], "rating"),
+    (["stale", "rating", "", "2", 800, "100A"], "rating"),
+    (["stale", "rating", 2, 800, "100A"], "rating"),
+    ([1, 2], "rating"),
+])
+def test_forged_cursors_are_rejected(payload, sort_by):
+    index = ProblemCatalog().reload(make_problems(10))
+    with pytest.raises(CursorError):
+        index.decode_cursor(forge(payload), sort_by)
+
+
+def test_cursor_is_bound_to_its_query():
+    index = ProblemCatalog().reload(make_problems(10))
+    first = query_digest(search="a", tags=None)
+    cursor = index.encode_cursor("relevance", 3, first)
+    assert index.decode_cursor(cursor, "relevance", query_digest(tags=None, search="a")) == 3
+    with pytest.raises(CursorError):
+        index.decode_cursor(cursor, "relevance", query_digest(search="tree", tags=None))
+
+
+def test_concurrent_requests_share_one_index_build(monkeypatch):
+    problems = make_problems(50)
+
+    class Client:
+        async def get_problemset(self):
+            return problems
+
+        async def get_contest_list(self):
+            return []
+
+    monkeypatch.setattr(problem_catalog, "get_cf_client", lambda: Client())
+    catalog = ProblemCatalog(source="codeforces")
+    builds = []
+    build = catalog._build
+    monkeypatch.setattr(catalog, "_build", lambda *args: builds.append(1) or build(*args))
+
+    async def main():
+        return await asyncio.gather(*(catalog.get_index() for _ in range(20)))
+
+    indexes = asyncio.run(main())
+    assert len(builds) == 1
+    assert all(index is indexes[0] for index in indexes)
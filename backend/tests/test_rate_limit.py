@@ -0,0 +1,49 @@
+import secrets
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.middleware.rate_limit import InboundRateLimitMiddleware
+from app.services.auth import create_access_token
+
+
+def make_client(trusted_proxies: int = 0) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(
+        InboundRateLimitMiddleware,
+        quotas={"default": 2},
+        endpoint_classes=[],
+        trusted_proxies=trusted_proxies
+    )
+    return TestClient(app)
+
+
+def test_unverified_tokens_share_the_ip_quota():
+    client = make_client()
+    statuses = [
+        client.get("/ping", headers={"Authorization": f"Bearer {secrets.token_urlsafe(16)}"}).status_code
+        for _ in range(4)
+    ]
+    assert statuses == [200, 200, 429, 429]
+
+
+def test_verified_token_is_limited_across_addresses():
+    client = make_client(trusted_proxies=1)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'alice'})}"}
+    statuses = [
+        client.get("/ping", headers={**headers, "X-Forwarded-For": f"10.0.0.{i}"}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
+
+
+def test_client_controlled_forwarded_for_entries_are_ignored():
+    client = make_client(trusted_proxies=1)
+    statuses = [
+        client.get("/ping", headers={"X-Forwarded-For": f"1.2.3.{i}, 10.0.0.1"}).status_code
+        for i in range(3)
+    ]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,45 @@
+import asyncio
+import time
+import pytest
+from app.config import settings
+from app.services.codeforces_client import CodeforcesClient
+from app.utils.cache import CacheEntry
+
+HOUR = 3600
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "persistent_cache_path", "")
+    monkeypatch.setattr(settings, "rate_limit_shared_state_path", "")
+    monkeypatch.setattr(settings, "rating_history_cache_ttl_seconds", 900)
+    monkeypatch.setattr(settings, "rating_update_lag_seconds", 6 * HOUR)
+    return CodeforcesClient()
+
+
+def is_current(client, monkeypatch, contest_end: float, stored_ago: float, last_update: float) -> bool:
+    contests = [{"id": 1, "phase": "FINISHED", "startTimeSeconds": contest_end - 2 * HOUR, "durationSeconds": 2 * HOUR}]
+
+    async def get_contest_list():
+        return contests
+
+    monkeypatch.setattr(client, "get_contest_list", get_contest_list)
+    entry = CacheEntry([{"ratingUpdateTimeSeconds": last_update}], stored_at=time.time() - stored_ago)
+    return asyncio.run(client._rating_history_is_current(entry))
+
+
+def test_history_synced_after_ratings_settled_is_current(client, monkeypatch):
+    now = time.time()
+    # Contest ended a day ago, history synced 12 hours ago, user did not take part
+    assert is_current(client, monkeypatch, now - 24 * HOUR, 12 * HOUR, now - 30 * 24 * HOUR)
+
+
+def test_history_already_rated_in_latest_contest_is_current(client, monkeypatch):
+    now = time.time()
+    # Synced right after the contest, but the history already has its rating change
+    assert is_current(client, monkeypatch, now - 3 * HOUR, 1 * HOUR, now - 2 * HOUR)
+
+
+def test_history_synced_before_ratings_settled_is_stale(client, monkeypatch):
+    now = time.time()
+    assert not is_current(client, monkeypatch, now - 3 * HOUR, 1 * HOUR, now - 30 * 24 * HOUR)
@@ -0,0 +1,37 @@
+import os
+import struct
+import pytest
+from app.utils.rate_limiter import PriorityRateLimiter, SharedTokenBucket
+
+pytest.importorskip("fcntl")
+
+
+def test_symlinked_state_file_is_refused(tmp_path):
+    target = tmp_path / "elsewhere"
+    target.write_bytes(b"")
+    link = tmp_path / "rate_limit.bucket"
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        SharedTokenBucket(str(link), rate=5, capacity=5)
+
+    # The limiter falls back to per-process limiting instead of failing startup
+    limiter = PriorityRateLimiter(max_calls=5, period=1.0, shared_state_path=str(link))
+    assert limiter.shared is None
+    assert limiter.try_acquire()
+
+
+def test_tampered_token_count_does_not_stall(tmp_path):
+    path = tmp_path / "rate_limit.bucket"
+    bucket = SharedTokenBucket(str(path), rate=5, capacity=5)
+    os.pwrite(bucket.fd, struct.pack("dd", -1e18, 1e18), 0)
+    assert bucket.try_take() < 1
+    bucket.close()
+
+
+def test_close_releases_the_state_file(tmp_path):
+    limiter = PriorityRateLimiter(max_calls=5, period=1.0, shared_state_path=str(tmp_path / "rate_limit.bucket"))
+    fd = limiter.shared.fd
+    limiter.close()
+    assert limiter.shared is None
+    with pytest.raises(OSError):
+        os.fstat(fd)
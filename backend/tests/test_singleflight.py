@@ -0,0 +1,54 @@
+import asyncio
+from app.utils.batcher import MicroBatcher
+from app.utils.deadline import DeadlineExceeded, deadline_scope, remaining, within_deadline
+from app.utils.singleflight import SingleFlight
+
+
+def test_shared_work_outlives_a_short_caller_deadline():
+    flight = SingleFlight()
+    deadlines = []
+
+    async def work():
+        deadlines.append(remaining())
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def impatient():
+        with deadline_scope(0.02):
+            return await within_deadline(flight.do("key", work))
+
+    async def patient():
+        await asyncio.sleep(0.005)
+        return await flight.do("key", work)
+
+    async def main():
+        return await asyncio.gather(impatient(), patient(), return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, DeadlineExceeded)
+    assert second == "done"
+    assert deadlines == [None]
+
+
+def test_batch_outlives_a_short_caller_deadline():
+    async def batch_fn(keys):
+        assert remaining() is None
+        await asyncio.sleep(0.1)
+        return {key: key.upper() for key in keys}
+
+    batcher = MicroBatcher(batch_fn, window=0.01)
+
+    async def impatient():
+        with deadline_scope(0.02):
+            return await within_deadline(batcher.load("a"))
+
+    async def patient():
+        await asyncio.sleep(0.005)
+        return await batcher.load("b")
+
+    async def main():
+        return await asyncio.gather(impatient(), patient(), return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, DeadlineExceeded)
+    assert second == "B"
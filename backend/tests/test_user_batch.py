@@ -0,0 +1,85 @@
+import asyncio
+import httpx
+import pytest
+from app.config import settings
+from app.services.codeforces_client import CodeforcesClient, CodeforcesUnavailableError
+
+KNOWN = {"tourist", "petr", "benq"}
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(monkeypatch):
+    monkeypatch.setattr(settings, "persistent_cache_path", "")
+    monkeypatch.setattr(settings, "rate_limit_shared_state_path", "")
+    monkeypatch.setattr(settings, "rate_limit_calls", 1000)
+    monkeypatch.setattr(settings, "http_max_retries", 0)
+    monkeypatch.setattr(settings, "hedging_enabled", False)
+
+
+def make_client(calls: list) -> CodeforcesClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        handles = request.url.params["handles"].split(";")
+        calls.append(handles)
+        if "broken" in handles:
+            return httpx.Response(400, json={"status": "FAILED", "comment": "Internal error"})
+        for handle in handles:
+            if handle not in KNOWN:
+                return httpx.Response(400, json={"status": "FAILED", "comment": f"handles: User with handle {handle} not found"})
+        return httpx.Response(200, json={"status": "OK", "result": [{"handle": handle} for handle in handles]})
+
+    return CodeforcesClient(
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        base_url="https://codeforces.test/api"
+    )
+
+
+def test_invalid_handle_does_not_fail_the_batch():
+    calls = []
+
+    async def run():
+        client = make_client(calls)
+        users = await client.get_users_info(["tourist", "x;bad1", "petr", "a"])
+        await client.close()
+        return users
+
+    users = asyncio.run(run())
+    assert users["tourist"]["handle"] == "tourist"
+    assert users["petr"]["handle"] == "petr"
+    assert users["x;bad1"] is None and users["a"] is None
+    assert all(";" not in handle for batch in calls for handle in batch)
+
+
+def test_unparsed_failure_only_fails_its_own_handle():
+    calls = []
+
+    async def run():
+        client = make_client(calls)
+        results = await asyncio.gather(
+            client.get_user_info("tourist"),
+            client.get_user_info("broken"),
+            client.get_user_info("benq"),
+            return_exceptions=True
+        )
+        await client.close()
+        return results
+
+    tourist, broken, benq = asyncio.run(run())
+    assert tourist["handle"] == "tourist" and benq["handle"] == "benq"
+    assert isinstance(broken, CodeforcesUnavailableError)
+
+
+def test_unknown_handles_split_the_batch_after_a_few_retries():
+    calls = []
+    handles = ["tourist"] + [f"ghost{i}" for i in range(16)]
+
+    async def run():
+        client = make_client(calls)
+        users = await client.get_users_info(handles)
+        await client.close()
+        return users
+
+    users = asyncio.run(run())
+    assert users["tourist"]["handle"] == "tourist"
+    assert all(users[handle] is None for handle in handles[1:])
+    # Removing one handle per call would take 17 sequential calls before tourist resolved
+    assert len([batch for batch in calls if "tourist" in batch]) <= 8